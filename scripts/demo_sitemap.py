@@ -49,6 +49,7 @@ async def demo_sitemap_functionality():
         if not os.getenv(key):
             os.environ[key] = value
 
+    scrapy_manager = None
     try:
         # Initialize components
         print("📋 Initializing Configuration Manager...")
@@ -160,6 +161,9 @@ async def demo_sitemap_functionality():
         import traceback
 
         traceback.print_exc()
+    finally:
+        if scrapy_manager is not None:
+            await scrapy_manager.aclose()
 
 
 if __name__ == "__main__":
@@ -31,6 +31,8 @@ async def demo_sitemap_functionality_mock() -> None:
         "SITEMAP_CONFIG": '{"https://docs.aleph-alpha.com/sitemap.xml": {"filters": ["/docs/api", "/docs/tutorial"], "max_pages": 10}}',
         "EMBEDDING_MODEL": "text-embedding-3-small",
         "EMBEDDING_DIMENSION": "1536",
+        # Run the simulated scraping paths instead of fetching real pages
+        "TAHECHO_SIMULATE": "1",
     }
 
     # Apply demo environment only if not already set
@@ -38,6 +40,7 @@ async def demo_sitemap_functionality_mock() -> None:
         if not os.getenv(key):
             os.environ[key] = value
 
+    scrapy_manager = None
     try:
         # Initialize components with mocked Supabase
         print("📋 Initializing Configuration Manager...")
@@ -149,6 +152,9 @@ async def demo_sitemap_functionality_mock() -> None:
         import traceback
 
         traceback.print_exc()
+    finally:
+        if scrapy_manager is not None:
+            await scrapy_manager.aclose()
 
 
 if __name__ == "__main__":
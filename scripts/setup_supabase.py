@@ -97,6 +97,11 @@ def setup_supabase_schema():
         CREATE INDEX IF NOT EXISTS idx_documents_tags ON documents USING GIN (tags);
         CREATE INDEX IF NOT EXISTS idx_documents_metadata ON documents USING GIN (metadata);
 
+        -- Half-precision copy of the embedding for similarity search (pgvector 0.7+)
+        ALTER TABLE documents ADD COLUMN IF NOT EXISTS embedding_half halfvec(1536)
+            GENERATED ALWAYS AS (embedding::halfvec(1536)) STORED;
+        CREATE INDEX IF NOT EXISTS idx_documents_embedding_half ON documents USING hnsw (embedding_half halfvec_cosine_ops);
+
         -- Source tracking table for managing different content sources
         CREATE TABLE IF NOT EXISTS content_sources (
             id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
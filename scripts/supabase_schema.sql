@@ -55,6 +55,12 @@ CREATE INDEX IF NOT EXISTS idx_documents_status ON documents (status);
 CREATE INDEX IF NOT EXISTS idx_documents_tags ON documents USING GIN (tags);
 CREATE INDEX IF NOT EXISTS idx_documents_metadata ON documents USING GIN (metadata);
 
+-- Half-precision copy of the embedding for similarity search (pgvector 0.7+).
+-- Halves the index size and the bytes read per scanned row.
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS embedding_half halfvec(1536)
+    GENERATED ALWAYS AS (embedding::halfvec(1536)) STORED;
+CREATE INDEX IF NOT EXISTS idx_documents_embedding_half ON documents USING hnsw (embedding_half halfvec_cosine_ops);
+
 -- Source tracking table for managing different content sources
 CREATE TABLE IF NOT EXISTS content_sources (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -128,6 +134,41 @@ BEGIN
 END;
 $$;
 
+-- Function for vector similarity search on the half-precision embeddings
+CREATE OR REPLACE FUNCTION match_documents_half(
+    query_embedding halfvec(1536),
+    match_threshold float DEFAULT 0.7,
+    match_count int DEFAULT 10
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    url TEXT,
+    content_preview TEXT,
+    source_type TEXT,
+    domain TEXT,
+    similarity float
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        documents.id,
+        documents.title,
+        documents.url,
+        documents.content_preview,
+        documents.source_type,
+        documents.domain,
+        1 - (documents.embedding_half <=> query_embedding) AS similarity
+    FROM documents
+    WHERE documents.embedding_half IS NOT NULL
+    AND 1 - (documents.embedding_half <=> query_embedding) > match_threshold
+    ORDER BY documents.embedding_half <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
 -- Enable Row Level Security (RLS)
 ALTER TABLE documents ENABLE ROW LEVEL SECURITY;
 ALTER TABLE content_sources ENABLE ROW LEVEL SECURITY;
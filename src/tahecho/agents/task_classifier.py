@@ -1,35 +1,27 @@
+import functools
+import json
 import logging
 import re
 from typing import Any, Dict, Optional
 
 from langchain.chat_models import init_chat_model
-from langchain_core.messages import AIMessage
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.messages import AIMessage, HumanMessage
 
 from config import CONFIG
 from tahecho.agents.state import AgentState
 
-logger = logging.getLogger(__name__)
-
+try:
+    import orjson
 
-class TaskClassifier:
-    """Classifies user tasks to determine which agent should handle them."""
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional, fall back to the stdlib parser
+    _json_loads = json.loads
 
-    def __init__(self) -> None:
-        openai_settings = CONFIG.get("OPENAI_SETTINGS", {})
-        if not isinstance(openai_settings, dict):
-            raise ValueError("OPENAI_SETTINGS must be a dictionary")
-        
-        model = openai_settings.get("model")
-        if not isinstance(model, str):
-            raise ValueError("OPENAI_SETTINGS.model must be a string")
-            
-        self.llm = init_chat_model(
-            model, model_provider="openai", temperature=0.1
-        )
+logger = logging.getLogger(__name__)
 
-        self.classification_prompt = ChatPromptTemplate.from_template(
-            """
+# Single-variable prompt, formatted directly instead of through a
+# ChatPromptTemplate; literal braces are escaped as {{ }}
+CLASSIFICATION_PROMPT = """
 You are a task classifier for a Jira management system. Your job is to determine which specialized agent should handle the user's request.
 
 Available agents:
@@ -63,6 +55,80 @@ Response format:
 }}
 ```
 """
+
+# Jira-related context indicators in previous messages
+_JIRA_CONTEXT_INDICATORS = (
+    "jira", "ticket", "assigned", "username", "email address",
+    "project key", "search for tickets", "mcp integration",
+    "clarification needed", "could you please tell me",
+)
+
+# Common follow-up patterns
+_FOLLOW_UP_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        # Username/email patterns
+        r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$",  # email
+        r"^[a-zA-Z][a-zA-Z0-9._-]{2,20}$",  # username-like (includes wolfgang.ihloff)
+        r"^[a-zA-Z][a-zA-Z0-9._-]*\.[a-zA-Z][a-zA-Z0-9._-]*$",  # dotted usernames like wolfgang.ihloff
+        # Project key patterns
+        r"^[A-Z]{2,10}$",  # project key like PGA, PROJ
+        # Simple confirmations
+        r"^(yes|y|no|n|ok|okay|sure)$",
+    )
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _lowercase(content: str) -> str:
+    """Lowercase message content, memoized across repeated classifications."""
+    return content.lower()
+
+
+def _extract_json_blob(text: str) -> Optional[str]:
+    """Return the first balanced JSON object in text, skipping braces in strings."""
+    start = text.find("{")
+    if start < 0:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : i + 1]
+
+    return None
+
+
+class TaskClassifier:
+    """Classifies user tasks to determine which agent should handle them."""
+
+    def __init__(self) -> None:
+        openai_settings = CONFIG.get("OPENAI_SETTINGS", {})
+        if not isinstance(openai_settings, dict):
+            raise ValueError("OPENAI_SETTINGS must be a dictionary")
+        
+        model = openai_settings.get("model")
+        if not isinstance(model, str):
+            raise ValueError("OPENAI_SETTINGS.model must be a string")
+            
+        self.llm = init_chat_model(
+            model, model_provider="openai", temperature=0.1
         )
 
     def classify_task(self, state: AgentState) -> AgentState:
@@ -79,11 +145,16 @@ Response format:
                 )
                 return state
 
-            # Create the classification chain
-            chain = self.classification_prompt | self.llm
-
             # Get classification
-            result = chain.invoke({"user_input": state.user_input})
+            result = self.llm.invoke(
+                [
+                    HumanMessage(
+                        content=CLASSIFICATION_PROMPT.format(
+                            user_input=state.user_input
+                        )
+                    )
+                ]
+            )
 
             # First, try keyword-based classification as fallback for reliability
             user_input_lower = state.user_input.lower()
@@ -104,19 +175,17 @@ Response format:
                 return state
 
             # Parse the response (assuming it's in JSON format)
-            import json
-
             # Extract JSON from the response
-            json_match = re.search(r"\{.*\}", result.content.strip(), re.DOTALL)
+            json_blob = _extract_json_blob(result.content.strip())
 
-            if json_match:
+            if json_blob:
                 try:
-                    classification = json.loads(json_match.group())
+                    classification = _json_loads(json_blob)
                     task_type = classification.get("task_type", "general")
                     reasoning = classification.get("reasoning", "")
                 except Exception:
                     # If JSON parsing fails, fallback to keyword search
-                    content = json_match.group()
+                    content = json_blob
                     if "jira" in content.lower():
                         task_type = "jira"
                     else:
@@ -125,7 +194,7 @@ Response format:
             else:
                 # Try to parse the entire string as JSON
                 try:
-                    classification = json.loads(result.content.strip())
+                    classification = _json_loads(result.content.strip())
                     task_type = classification.get("task_type", "general")
                     reasoning = classification.get("reasoning", "")
                 except Exception:
@@ -167,43 +236,34 @@ Response format:
 
     def _check_conversation_context(self, state: AgentState) -> Optional[str]:
         """Check if this is a follow-up to a previous Jira conversation."""
-        if not state.messages or len(state.messages) < 2:
+        stripped_input = state.user_input.strip() if state.user_input else ""
+        if not stripped_input or not state.messages or len(state.messages) < 2:
+            return None
+
+        # Long free-form text is a new request, not a follow-up answer
+        if len(stripped_input) > 200:
             return None
             
+        # Check if current input looks like a follow-up response before
+        # touching the conversation history
+        is_follow_up = (
+            any(pattern.match(stripped_input) for pattern in _FOLLOW_UP_PATTERNS)
+            or len(stripped_input.split()) <= 3  # Short responses likely follow-ups
+        )
+        if not is_follow_up:
+            return None
+
         # Look at recent messages for Jira context
-        recent_messages = state.messages[-5:]  # Check last 5 messages
-        
-        for message in recent_messages:
-            if hasattr(message, 'content') and message.content:
-                content_lower = message.content.lower()
-                
-                # Check for Jira-related context indicators
-                jira_context_indicators = [
-                    "jira", "ticket", "assigned", "username", "email address",
-                    "project key", "search for tickets", "mcp integration",
-                    "clarification needed", "could you please tell me"
-                ]
-                
-                if any(indicator in content_lower for indicator in jira_context_indicators):
-                    # Check if current input looks like a follow-up response
-                    user_input_lower = state.user_input.lower()
-                    
-                    # Common follow-up patterns
-                    follow_up_patterns = [
-                        # Username/email patterns
-                        r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$',  # email
-                        r'^[a-zA-Z][a-zA-Z0-9._-]{2,20}$',  # username-like (includes wolfgang.ihloff)
-                        r'^[a-zA-Z][a-zA-Z0-9._-]*\.[a-zA-Z][a-zA-Z0-9._-]*$',  # dotted usernames like wolfgang.ihloff
-                        # Project key patterns
-                        r'^[A-Z]{2,10}$',  # project key like PGA, PROJ
-                        # Simple confirmations
-                        r'^(yes|y|no|n|ok|okay|sure)$'
-                    ]
-                    
-                    if (any(re.match(pattern, state.user_input.strip(), re.IGNORECASE) for pattern in follow_up_patterns) or
-                        len(state.user_input.strip().split()) <= 3):  # Short responses likely follow-ups
-                        return "jira"
-                        
+        for message in state.messages[-5:]:  # Check last 5 messages
+            content = getattr(message, "content", None)
+            if content and isinstance(content, str):
+                content_lower = _lowercase(content)
+                if any(
+                    indicator in content_lower
+                    for indicator in _JIRA_CONTEXT_INDICATORS
+                ):
+                    return "jira"
+
         return None
 
 
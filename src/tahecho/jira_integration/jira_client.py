@@ -1,7 +1,51 @@
+import logging
+from typing import Iterator, Optional
+
+import requests
 from atlassian import Jira
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from config import CONFIG
 
+logger = logging.getLogger(__name__)
+
+# Fields read by get_all_jira_issues; requesting only these keeps each page small
+ISSUE_FIELDS = (
+    "summary",
+    "description",
+    "status",
+    "priority",
+    "issuetype",
+    "project",
+    "assignee",
+    "reporter",
+    "created",
+    "updated",
+    "resolution",
+    "resolutiondate",
+    "duedate",
+    "labels",
+    "issuelinks",
+)
+
+
+def _create_session(pool_size: int = 32) -> requests.Session:
+    """Session with pooled keep-alive connections, retrying throttled requests."""
+    retries = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=(429, 502, 503, 504),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 class JiraClient:
     def __init__(self):
@@ -11,26 +55,52 @@ class JiraClient:
                 username=CONFIG["JIRA_USERNAME"],
                 password=CONFIG["JIRA_API_TOKEN"],
                 cloud=CONFIG["JIRA_CLOUD"],
+                session=_create_session(),
             )
         except Exception as e:
-            print(f"Failed to initialize Jira client: {e}")
+            logger.error(f"Failed to initialize Jira client: {e}")
             self.instance = None
 
     def get_instance(self):
         return self.instance
 
-    def get_all_jira_issues(self):
-        """Obtiene todas las issues de Jira."""
+    def _iter_issues(self, jql: str, batch_size: int) -> Iterator[dict]:
+        """Recorre los resultados de una consulta JQL página a página.
+
+        Jira puede devolver menos resultados que batch_size si su límite es
+        menor, así que se avanza según lo recibido hasta alcanzar el total.
+        """
+        start = 0
+        while True:
+            page = self.instance.jql(
+                jql, fields=list(ISSUE_FIELDS), start=start, limit=batch_size
+            )
+            issues = page.get("issues") or []
+            yield from issues
+
+            start += len(issues)
+            if not issues or start >= page.get("total", 0):
+                return
+
+    def get_all_jira_issues(
+        self, updated_since: Optional[str] = None, batch_size: int = 500
+    ):
+        """Obtiene todas las issues de Jira.
+
+        updated_since (p. ej. "-7d") filtra en el servidor las issues sin
+        cambios recientes, en lugar de descargarlas y descartarlas aquí.
+        Se rechazan valores con comillas para que no alteren la consulta JQL.
+        """
 
         try:
             jql = "ORDER BY created DESC"
-            issues = self.instance.jql(jql, limit=9999)
-
-            if not issues.get("issues"):
-                return {"message": "No se encontraron incidencias en Jira."}
+            if updated_since:
+                if '"' in updated_since or "\\" in updated_since:
+                    raise ValueError(f"Invalid updated_since value: {updated_since!r}")
+                jql = f'updated >= "{updated_since}" {jql}'
 
             filtered_issues = []
-            for issue in issues["issues"]:
+            for issue in self._iter_issues(jql, batch_size):
                 inward_keys = [
                     link["inwardIssue"]["key"]
                     for link in issue["fields"].get("issuelinks", [])
@@ -111,6 +181,11 @@ class JiraClient:
                 }
                 filtered_issues.append(filtered_issue)
 
+            if not filtered_issues:
+                return {"message": "No se encontraron incidencias en Jira."}
+
+            logger.info(f"Fetched {len(filtered_issues)} Jira issues")
+
             return filtered_issues
         except Exception as e:
             return {"error": f"Error al obtener las incidencias de Jira: {str(e)}"}
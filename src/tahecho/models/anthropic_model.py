@@ -1,10 +1,10 @@
 import os
 
-from smolagents import LiteLLMModel, OpenAIServerModel
-
 
 class AnthropicModel:
     def __init__(self):
+        from smolagents import OpenAIServerModel
+
         self.model = OpenAIServerModel(
             model_id="openrouter/anthropic/claude-3-sonnet",
             api_base="https://openrouter.ai/api/v1",
@@ -15,4 +15,20 @@ class AnthropicModel:
         return self.model
 
 
-anthropic_model = AnthropicModel().get_model()
+# Global instance - lazy initialization
+_anthropic_model_instance = None
+
+
+def get_anthropic_model():
+    """Get the global Anthropic model, creating it if needed."""
+    global _anthropic_model_instance
+    if _anthropic_model_instance is None:
+        _anthropic_model_instance = AnthropicModel().get_model()
+    return _anthropic_model_instance
+
+
+def __getattr__(name: str):
+    """Lazy load the anthropic_model when first accessed."""
+    if name == "anthropic_model":
+        return get_anthropic_model()
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
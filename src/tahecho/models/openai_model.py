@@ -1,11 +1,11 @@
-from smolagents import OpenAIServerModel
-
 from config import CONFIG
 
 
 class OpenAIModel:
 
     def __init__(self):
+        from smolagents import OpenAIServerModel
+
         self.model = OpenAIServerModel(
             model_id="gpt-4o", api_key=CONFIG["OPENAI_API_KEY"]
         )
@@ -14,4 +14,20 @@ class OpenAIModel:
         return self.model
 
 
-openai_model = OpenAIModel().get_model()
+# Global instance - lazy initialization
+_openai_model_instance = None
+
+
+def get_openai_model():
+    """Get the global OpenAI model, creating it if needed."""
+    global _openai_model_instance
+    if _openai_model_instance is None:
+        _openai_model_instance = OpenAIModel().get_model()
+    return _openai_model_instance
+
+
+def __getattr__(name: str):
+    """Lazy load the openai_model when first accessed."""
+    if name == "openai_model":
+        return get_openai_model()
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -1,13 +1,36 @@
 """Sitemap awareness package for Tahecho."""
 
-from .configuration_manager import ConfigurationManager
-from .embedding_generator import EmbeddingGenerator
-from .scrapy_manager import ScrapyManager
-from .supabase_integration import SupabaseIntegration
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .configuration_manager import ConfigurationManager, SitemapSettings
+    from .embedding_generator import EmbeddingGenerator
+    from .scrapy_manager import ScrapyManager
+    from .supabase_integration import SupabaseIntegration
 
 __all__ = [
     "ConfigurationManager",
+    "SitemapSettings",
     "SupabaseIntegration",
     "ScrapyManager",
     "EmbeddingGenerator",
 ]
+
+# Submodules are imported on first attribute access so that importing the
+# package does not pull in Supabase, OpenAI and their transitive dependencies
+_LAZY_IMPORTS = {
+    "ConfigurationManager": ".configuration_manager",
+    "SitemapSettings": ".configuration_manager",
+    "SupabaseIntegration": ".supabase_integration",
+    "ScrapyManager": ".scrapy_manager",
+    "EmbeddingGenerator": ".embedding_generator",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Lazy load the public sitemap classes when first accessed."""
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
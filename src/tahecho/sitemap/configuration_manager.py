@@ -3,14 +3,37 @@
 import json
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
 from urllib.parse import urlparse
 
-import yaml
-
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, slots=True)
+class SitemapSettings:
+    """Immutable snapshot of the sitemap settings loaded from the environment."""
+
+    supabase_url: str
+    supabase_anon_key: str
+    supabase_service_key: Optional[str]
+    sitemap_urls: Tuple[str, ...]
+    requests_per_second: int
+    per_domain_max_concurrency: int
+    max_tasks_per_minute: int
+    desired_concurrency: int
+    max_memory_mb: int
+    max_pages: int
+    write_batch_size: int
+    verify_ssl: bool
+    embedding_model: str
+    embedding_dimension: int
+    async_enabled: bool
+    batch_size: int
+    cleanup_after_upload: bool
+
+
 class ConfigurationManager:
     """Manages configuration for sitemap agents."""
 
@@ -23,6 +46,7 @@ class ConfigurationManager:
 
         self._enabled = self._get_bool_env("SITEMAP_AGENTS_ENABLED", False)
         self._yaml_config = {}
+        self.settings: Optional[SitemapSettings] = None
 
         if self._enabled:
             self._validate_required_config()
@@ -43,11 +67,6 @@ class ConfigurationManager:
 
     def _validate_required_config(self):
         """Validate that required configuration is present."""
-        # Load environment variables from .env file
-        from dotenv import load_dotenv
-
-        load_dotenv()
-
         required_keys = ["SUPABASE_URL", "SUPABASE_ANON_KEY"]
         missing_keys = [key for key in required_keys if not os.getenv(key)]
 
@@ -58,28 +77,34 @@ class ConfigurationManager:
 
     def _load_config(self):
         """Load configuration from environment variables."""
-        self._supabase_url = os.getenv("SUPABASE_URL")
-        self._supabase_anon_key = os.getenv("SUPABASE_ANON_KEY")
-        self._supabase_service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-
-        # Sitemap configuration
         sitemap_urls = os.getenv("SITEMAP_URLS", "")
-        self._sitemap_urls = [
-            url.strip() for url in sitemap_urls.split(",") if url.strip()
-        ]
-
-        self._requests_per_second = self._get_int_env("SITEMAP_REQUESTS_PER_SECOND", 2)
-        self._max_pages = self._get_int_env("SITEMAP_MAX_PAGES", 100)
-        self._verify_ssl = self._get_bool_env("SITEMAP_VERIFY_SSL", False)
 
-        # Embedding configuration
-        self._embedding_model = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
-        self._embedding_dimension = self._get_int_env("EMBEDDING_DIMENSION", 1536)
-
-        # Processing configuration
-        self._async_enabled = self._get_bool_env("ASYNC_PROCESSING_ENABLED", True)
-        self._batch_size = self._get_int_env("PROCESSING_BATCH_SIZE", 10)
-        self._cleanup_after_upload = self._get_bool_env("CLEANUP_AFTER_UPLOAD", True)
+        self.settings = SitemapSettings(
+            supabase_url=os.getenv("SUPABASE_URL"),
+            supabase_anon_key=os.getenv("SUPABASE_ANON_KEY"),
+            supabase_service_key=os.getenv("SUPABASE_SERVICE_ROLE_KEY"),
+            # Sitemap configuration
+            sitemap_urls=tuple(
+                url.strip() for url in sitemap_urls.split(",") if url.strip()
+            ),
+            requests_per_second=self._get_int_env("SITEMAP_REQUESTS_PER_SECOND", 2),
+            per_domain_max_concurrency=self._get_int_env(
+                "SITEMAP_PER_DOMAIN_MAX_CONCURRENCY", 1
+            ),
+            max_tasks_per_minute=self._get_int_env("SITEMAP_MAX_TASKS_PER_MINUTE", 30),
+            desired_concurrency=self._get_int_env("SITEMAP_DESIRED_CONCURRENCY", 10),
+            max_memory_mb=self._get_int_env("SITEMAP_MAX_MEMORY_MB", 0),
+            max_pages=self._get_int_env("SITEMAP_MAX_PAGES", 100),
+            write_batch_size=self._get_int_env("SITEMAP_WRITE_BATCH_SIZE", 100),
+            verify_ssl=self._get_bool_env("SITEMAP_VERIFY_SSL", False),
+            # Embedding configuration
+            embedding_model=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"),
+            embedding_dimension=self._get_int_env("EMBEDDING_DIMENSION", 1536),
+            # Processing configuration
+            async_enabled=self._get_bool_env("ASYNC_PROCESSING_ENABLED", True),
+            batch_size=self._get_int_env("PROCESSING_BATCH_SIZE", 10),
+            cleanup_after_upload=self._get_bool_env("CLEANUP_AFTER_UPLOAD", True),
+        )
 
         # Load sitemap-specific configuration
         self._load_sitemap_config()
@@ -97,29 +122,49 @@ class ConfigurationManager:
         """Check if sitemap agents are enabled."""
         return self._enabled
 
-    def get_sitemap_urls(self) -> List[str]:
-        """Get list of sitemap URLs."""
-        return self._sitemap_urls.copy()
+    def get_sitemap_urls(self) -> Tuple[str, ...]:
+        """Get sitemap URLs as an immutable tuple."""
+        return self.settings.sitemap_urls
 
     def get_requests_per_second(self) -> int:
         """Get requests per second limit."""
-        return self._requests_per_second
+        return self.settings.requests_per_second
+
+    def get_per_domain_max_concurrency(self) -> int:
+        """Get maximum number of concurrent operations per sitemap domain."""
+        return self.settings.per_domain_max_concurrency
+
+    def get_max_tasks_per_minute(self) -> int:
+        """Get maximum number of operations started per minute."""
+        return self.settings.max_tasks_per_minute
+
+    def get_desired_concurrency(self) -> int:
+        """Get initial number of pages fetched concurrently per sitemap."""
+        return self.settings.desired_concurrency
+
+    def get_max_memory_mb(self) -> int:
+        """Get memory budget for scraping in MB (0 disables the memory check)."""
+        return self.settings.max_memory_mb
 
     def get_max_pages(self) -> int:
         """Get maximum pages to scrape."""
-        return self._max_pages
+        return self.settings.max_pages
+
+    def get_write_batch_size(self) -> int:
+        """Get number of new pages stored per bulk insert."""
+        return self.settings.write_batch_size
 
     def get_supabase_url(self) -> str:
         """Get Supabase URL."""
-        return self._supabase_url
+        return self.settings.supabase_url
 
     def get_supabase_anon_key(self) -> str:
         """Get Supabase anonymous key."""
-        return self._supabase_anon_key
+        return self.settings.supabase_anon_key
 
     def get_supabase_service_key(self) -> Optional[str]:
         """Get Supabase service role key."""
-        return self._supabase_service_key
+        return self.settings.supabase_service_key
 
     def get_sitemap_config(self, sitemap_url: str) -> Optional[Dict[str, Any]]:
         """Get sitemap-specific configuration."""
@@ -127,30 +172,38 @@ class ConfigurationManager:
 
     def get_embedding_config(self) -> Dict[str, Any]:
         """Get embedding configuration."""
-        return {"model": self._embedding_model, "dimension": self._embedding_dimension}
+        return {
+            "model": self.settings.embedding_model,
+            "dimension": self.settings.embedding_dimension,
+        }
 
     def get_processing_config(self) -> Dict[str, Any]:
         """Get processing configuration."""
         return {
-            "async_enabled": self._async_enabled,
-            "batch_size": self._batch_size,
-            "cleanup_after_upload": self._cleanup_after_upload,
-            "verify_ssl": self._verify_ssl,
+            "async_enabled": self.settings.async_enabled,
+            "batch_size": self.settings.batch_size,
+            "cleanup_after_upload": self.settings.cleanup_after_upload,
+            "verify_ssl": self.settings.verify_ssl,
         }
 
     def load_yaml_config(self, config_path: str):
         """Load configuration from YAML file."""
+        import yaml
+
         try:
             with open(config_path, "r") as file:
-                self._yaml_config = yaml.safe_load(file)
+                self._yaml_config = yaml.safe_load(file) or {}
             logger.info(f"Loaded YAML configuration from {config_path}")
         except Exception as e:
             logger.error(f"Failed to load YAML configuration from {config_path}: {e}")
             self._yaml_config = {}
 
-    def get_yaml_config(self) -> Dict[str, Any]:
-        """Get YAML configuration."""
-        return self._yaml_config.copy()
+    def get_yaml_config(self) -> Mapping[str, Any]:
+        """Get a read-only view of the YAML configuration.
+
+        Callers that need to modify it should take a copy with dict(...).
+        """
+        return MappingProxyType(self._yaml_config)
 
     def get_sitemap_domain(self, sitemap_url: str) -> str:
         """Get domain from sitemap URL."""
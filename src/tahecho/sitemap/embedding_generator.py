@@ -1,13 +1,83 @@
 """Embedding generator for sitemap content."""
 
 import asyncio
+import functools
+import hashlib
+import importlib.util
 import logging
-from typing import Any, Dict, List
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
 
+import httpx
+import numpy as np
 import openai
 
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional, fall back to character truncation
+    tiktoken = None
+
 logger = logging.getLogger(__name__)
 
+# Process-wide OpenAI client so every generator shares one connection pool
+_CLIENT: Optional[openai.AsyncOpenAI] = None
+_CLIENT_LOCK = threading.Lock()
+
+# HTTP/2 needs the optional ``h2`` package; fall back to HTTP/1.1 keep-alive
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Batch requests are split into chunks and sent concurrently
+BATCH_CHUNK_SIZE = 96
+MAX_CONCURRENT_REQUESTS = 8
+
+# Maximum number of embeddings kept in each generator's LRU cache
+EMBEDDING_CACHE_SIZE = 10_000
+
+
+def _get_client() -> openai.AsyncOpenAI:
+    """Get the shared AsyncOpenAI client, creating it if needed."""
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = openai.AsyncOpenAI(
+                    http_client=httpx.AsyncClient(
+                        http2=_HTTP2_AVAILABLE,
+                        limits=httpx.Limits(
+                            max_keepalive_connections=64, max_connections=128
+                        ),
+                        timeout=30.0,
+                    )
+                )
+    return _CLIENT
+
+
+async def aclose_shared_client() -> None:
+    """Close the shared OpenAI client on the caller's event loop.
+
+    Await this before the loop that used the client shuts down. Generators
+    created afterwards get a new client.
+    """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        client, _CLIENT = _CLIENT, None
+    if client is None:
+        return
+    try:
+        await client.close()
+    except Exception as e:
+        logger.debug(f"Failed to close shared OpenAI client: {e}")
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding(model: str) -> "tiktoken.Encoding":
+    """Get the tokenizer for an embedding model, shared across generators."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
 
 class EmbeddingGenerator:
     """Generates embeddings for sitemap content using OpenAI."""
@@ -16,16 +86,49 @@ class EmbeddingGenerator:
         """Initialize embedding generator."""
         self.model = config.get("model", "text-embedding-3-small")
         self.dimension = config.get("dimension", 1536)
-        self.client = openai.AsyncOpenAI()
+        self.client = _get_client()
+        self._cache: OrderedDict[str, np.ndarray] = OrderedDict()
+
+    def _cache_key(self, text: str) -> str:
+        """Build the cache key for a text embedded with the current model."""
+        return hashlib.blake2b(
+            f"{self.model}:{text}".encode(), digest_size=16
+        ).hexdigest()
+
+    def _to_array(self, embedding: List[float]) -> np.ndarray:
+        """Convert an API embedding to a read-only float32 vector."""
+        array = np.asarray(embedding, dtype=np.float32)
+        # Cached arrays are shared between callers, so guard against mutation
+        array.flags.writeable = False
+        return array
+
+    def _cache_get(self, key: str) -> Optional[np.ndarray]:
+        """Return a cached embedding and mark it as recently used."""
+        embedding = self._cache.get(key)
+        if embedding is not None:
+            self._cache.move_to_end(key)
+        return embedding
+
+    def _cache_put(self, key: str, embedding: np.ndarray) -> None:
+        """Store an embedding, evicting the least recently used entry."""
+        self._cache[key] = embedding
+        self._cache.move_to_end(key)
+        if len(self._cache) > EMBEDDING_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    async def generate_embedding(self, text: str) -> np.ndarray:
+        """Generate a float32 embedding vector for a text string."""
+        key = self._cache_key(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
 
-    async def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for a text string."""
         try:
             response = await self.client.embeddings.create(
                 model=self.model, input=text, encoding_format="float"
             )
 
-            embedding = response.data[0].embedding
+            embedding = self._to_array(response.data[0].embedding)
 
             # Validate dimension
             if len(embedding) != self.dimension:
@@ -33,66 +136,121 @@ class EmbeddingGenerator:
                     f"Expected embedding dimension {self.dimension}, got {len(embedding)}"
                 )
 
+            self._cache_put(key, embedding)
             return embedding
 
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
             raise
 
-    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for multiple texts in batch."""
+    async def generate_embeddings_batch(self, texts: List[str]) -> np.ndarray:
+        """Generate embeddings for multiple texts as an (N, dimension) matrix."""
+        keys = [self._cache_key(text) for text in texts]
+        embeddings: List[Optional[np.ndarray]] = [self._cache_get(k) for k in keys]
+
+        # Only embed texts that are not cached yet, each distinct text once
+        pending: Dict[str, str] = {}
+        for key, text, embedding in zip(keys, texts, embeddings):
+            if embedding is None and key not in pending:
+                pending[key] = text
+
+        if not pending:
+            return self._stack(embeddings)
+
         try:
-            response = await self.client.embeddings.create(
-                model=self.model, input=texts, encoding_format="float"
-            )
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+            async def embed_chunk(chunk: List[str]):
+                async with semaphore:
+                    return await self.client.embeddings.create(
+                        model=self.model, input=chunk, encoding_format="float"
+                    )
+
+            pending_texts = list(pending.values())
+            chunks = [
+                pending_texts[i : i + BATCH_CHUNK_SIZE]
+                for i in range(0, len(pending_texts), BATCH_CHUNK_SIZE)
+            ]
+            responses = await asyncio.gather(*(embed_chunk(c) for c in chunks))
 
-            embeddings = [data.embedding for data in response.data]
+            new_embeddings = [
+                self._to_array(data.embedding)
+                for response in responses
+                for data in response.data
+            ]
 
             # Validate dimensions
-            for i, embedding in enumerate(embeddings):
+            for i, embedding in enumerate(new_embeddings):
                 if len(embedding) != self.dimension:
                     logger.warning(
                         f"Expected embedding dimension {self.dimension}, got {len(embedding)} for text {i}"
                     )
 
-            return embeddings
+            fetched = dict(zip(pending, new_embeddings))
+            for key, embedding in fetched.items():
+                self._cache_put(key, embedding)
+
+            return self._stack(
+                [
+                    embedding if embedding is not None else fetched[key]
+                    for key, embedding in zip(keys, embeddings)
+                ]
+            )
 
         except Exception as e:
             logger.error(f"Failed to generate embeddings batch: {e}")
             raise
 
-    def validate_embedding(self, embedding: List[float]) -> bool:
+    def _stack(self, embeddings: List[np.ndarray]) -> np.ndarray:
+        """Stack embedding vectors into a single matrix."""
+        if not embeddings:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return np.stack(embeddings)
+
+    def validate_embedding(self, embedding: np.ndarray) -> bool:
         """Validate embedding dimension."""
-        return len(embedding) == self.dimension
+        return np.shape(embedding) == (self.dimension,)
+
+    def _truncate(self, content: str, max_tokens: int) -> str:
+        """Truncate content to at most max_tokens tokens."""
+        if tiktoken is None:
+            return content[:max_tokens]
+        # A token covers at least one UTF-8 byte, so short content never needs
+        # tokenizing
+        if len(content) * 4 > max_tokens:
+            encoding = _get_encoding(self.model)
+            tokens = encoding.encode(content)
+            if len(tokens) > max_tokens:
+                return encoding.decode(tokens[:max_tokens])
+        return content
 
     async def generate_content_embedding(
-        self, content: str, max_length: int = 8000
-    ) -> List[float]:
-        """Generate embedding for content with length limit."""
-        # Truncate content if too long
-        if len(content) > max_length:
-            content = content[:max_length] + "..."
+        self, content: str, max_tokens: int = 8000
+    ) -> np.ndarray:
+        """Generate embedding for content truncated to max_tokens tokens."""
+        return await self.generate_embedding(self._truncate(content, max_tokens))
 
-        return await self.generate_embedding(content)
+    async def generate_content_embeddings_batch(
+        self, contents: List[str], max_tokens: int = 8000
+    ) -> np.ndarray:
+        """Generate embeddings for several contents as an (N, dimension) matrix."""
+        return await self.generate_embeddings_batch(
+            [self._truncate(content, max_tokens) for content in contents]
+        )
 
-    async def generate_title_embedding(self, title: str) -> List[float]:
+    async def generate_title_embedding(self, title: str) -> np.ndarray:
         """Generate embedding for page title."""
         return await self.generate_embedding(title)
 
     async def generate_combined_embedding(
         self, title: str, content: str, title_weight: float = 0.3
-    ) -> List[float]:
+    ) -> np.ndarray:
         """Generate combined embedding from title and content."""
         title_embedding = await self.generate_title_embedding(title)
         content_embedding = await self.generate_content_embedding(content)
 
-        # Combine embeddings with weights
-        combined_embedding = []
-        for i in range(len(title_embedding)):
-            combined_value = (
-                title_weight * title_embedding[i]
-                + (1 - title_weight) * content_embedding[i]
-            )
-            combined_embedding.append(combined_value)
-
-        return combined_embedding
+        # Combine embeddings with weights as c + w * (t - c) in one buffer
+        combined = np.subtract(title_embedding, content_embedding, dtype=np.float32)
+        combined *= title_weight
+        combined += content_embedding
+        return combined
@@ -1,18 +1,398 @@
 """Scrapy manager for sitemap scraping operations."""
 
 import asyncio
+import hashlib
+import importlib.util
+import itertools
 import logging
+import os
+import time
 import uuid
-from datetime import datetime
+from collections import deque
+from contextlib import aclosing, suppress
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+)
+from urllib.parse import urlparse
+
+import httpx
+import numpy as np
+from bs4 import BeautifulSoup
+from lxml import etree
 
 from .configuration_manager import ConfigurationManager
-from .embedding_generator import EmbeddingGenerator
+from .embedding_generator import EmbeddingGenerator, aclose_shared_client
 from .supabase_integration import SupabaseIntegration
 
 logger = logging.getLogger(__name__)
 
+# Length of the plain-text preview stored alongside each page
+CONTENT_PREVIEW_LENGTH = 200
+
+# Markup that never contributes to the page text
+NON_CONTENT_TAGS = ("script", "style", "noscript", "template")
+
+# Maximum time new pages wait in the write queue before being flushed
+PAGE_FLUSH_INTERVAL = 0.5
+
+# Maximum nesting of sitemap index files that is followed
+MAX_SITEMAP_DEPTH = 3
+
+# Number of sitemap URLs checked against stored documents per query
+URL_LOOKUP_BATCH_SIZE = 500
+
+# Number of operations kept for status queries; older finished ones are dropped
+MAX_OPERATION_HISTORY = 1000
+
+# Interval at which page counters are published to the operation state
+PROGRESS_UPDATE_INTERVAL = 0.5
+
+# Bounds for the number of pages fetched concurrently within one sitemap
+MIN_PAGE_CONCURRENCY = 1
+MAX_PAGE_CONCURRENCY = 50
+
+# HTTP/2 needs the optional ``h2`` package; fall back to HTTP/1.1 keep-alive
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Pages whose 64-bit SimHash over word 5-grams differs from the stored one in
+# at most SIMHASH_MAX_DISTANCE bits are treated as unchanged
+SIMHASH_SHINGLE_SIZE = 5
+SIMHASH_MAX_DISTANCE = 3
+
+
+def simhash(text: str) -> int:
+    """Compute the 64-bit SimHash of a text over its word shingles."""
+    words = text.lower().split()
+    if not words:
+        return 0
+    shingles = [
+        " ".join(words[i : i + SIMHASH_SHINGLE_SIZE])
+        for i in range(max(len(words) - SIMHASH_SHINGLE_SIZE + 1, 1))
+    ]
+    hashes = np.array(
+        [
+            int.from_bytes(
+                hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big"
+            )
+            for shingle in shingles
+        ],
+        dtype=">u8",
+    )
+    # One row of 64 bits per shingle, most significant bit first
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1)
+    fingerprint = np.packbits(bits.sum(axis=0) * 2 > len(shingles))
+    return int.from_bytes(fingerprint.tobytes(), "big")
+
+
+def _is_near_duplicate(stored_simhash: Optional[str], new_simhash: str) -> bool:
+    """Check whether two hex SimHashes are within SIMHASH_MAX_DISTANCE bits."""
+    if not stored_simhash:
+        return False
+    distance = (int(stored_simhash, 16) ^ int(new_simhash, 16)).bit_count()
+    return distance <= SIMHASH_MAX_DISTANCE
+
+
+def _format_timestamp(timestamp: float) -> str:
+    """Render an epoch timestamp as a timezone-aware UTC ISO 8601 string."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+@dataclass(slots=True)
+class Operation:
+    """State of a scraping or update operation.
+
+    Timestamps are kept as epoch seconds and only formatted in to_dict().
+    """
+
+    id: str
+    url: str
+    incremental: bool
+    differential: bool
+    config: Dict[str, Any]
+    type: str = "scrape"
+    status: str = "running"
+    progress: int = 0
+    started_at: float = field(default_factory=time.time)
+    completed_at: Optional[float] = None
+    error: Optional[str] = None
+    pages_processed: int = 0
+    pages_unchanged: int = 0
+    parse_errors: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the operation as a dict with UTC ISO 8601 timestamps."""
+        data = asdict(self)
+        data["started_at"] = _format_timestamp(self.started_at)
+        if self.completed_at is not None:
+            data["completed_at"] = _format_timestamp(self.completed_at)
+        return data
+
+
+class _RateLimiter:
+    """Token bucket that allows at most max_tasks acquisitions per period."""
+
+    def __init__(self, max_tasks: int, period: float = 60.0):
+        self._capacity = max(max_tasks, 1)
+        self._rate = self._capacity / period
+        self._tokens = float(self._capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._capacity, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+class _AutoscaledPool:
+    """Run a coroutine for each item of an async iterator concurrently.
+
+    Concurrency starts at desired_concurrency and is adjusted every
+    scale_interval seconds: it grows while the event loop keeps up and
+    the current RSS is below max_memory_ratio of max_memory_bytes, and
+    shrinks otherwise. Without a memory budget only loop lag is checked.
+    """
+
+    def __init__(
+        self,
+        worker: Callable[[Any], Awaitable[None]],
+        min_concurrency: int = MIN_PAGE_CONCURRENCY,
+        max_concurrency: int = MAX_PAGE_CONCURRENCY,
+        desired_concurrency: int = 10,
+        scale_interval: float = 1.0,
+        max_loop_lag: float = 0.05,
+        max_memory_bytes: Optional[int] = None,
+        max_memory_ratio: float = 0.75,
+    ):
+        self._worker = worker
+        self.min_concurrency = max(min_concurrency, 1)
+        self.max_concurrency = max(max_concurrency, self.min_concurrency)
+        self.concurrency = min(
+            max(desired_concurrency, self.min_concurrency), self.max_concurrency
+        )
+        self._scale_interval = scale_interval
+        self._max_loop_lag = max_loop_lag
+        self._max_memory_bytes = max_memory_bytes
+        self._max_memory_ratio = max_memory_ratio
+
+    async def run(self, items: AsyncIterator[Any]):
+        """Process all items, raising the first worker error."""
+        scaler = asyncio.create_task(self._scale_loop())
+        tasks: set = set()
+        try:
+            async for item in items:
+                while len(tasks) >= self.concurrency:
+                    done, tasks = await asyncio.wait(
+                        tasks, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        task.result()
+                tasks.add(asyncio.create_task(self._worker(item)))
+
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    task.result()
+        finally:
+            scaler.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(scaler, *tasks, return_exceptions=True)
+
+    async def _scale_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self._scale_interval
+            await asyncio.sleep(self._scale_interval)
+            lag = loop.time() - expected
+
+            step = max(self.concurrency // 10, 1)
+            if lag < self._max_loop_lag and not self._memory_pressure():
+                self.concurrency = min(self.concurrency + step, self.max_concurrency)
+            else:
+                self.concurrency = max(self.concurrency - step, self.min_concurrency)
+
+    def _memory_pressure(self) -> bool:
+        """Check whether the current RSS is close to the memory budget."""
+        if not self._max_memory_bytes:
+            return False
+        rss = _current_rss()
+        if rss is None:
+            return False
+        return rss > self._max_memory_bytes * self._max_memory_ratio
+
+
+def _current_rss() -> Optional[int]:
+    """Current resident set size in bytes, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class _PageBatchWriter:
+    """Queue-backed writer that stores new pages in bulk.
+
+    Pages are flushed once batch_size of them are queued or flush_interval
+    seconds after the first page of a batch arrived, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+        batch_size: int,
+        flush_interval: float = PAGE_FLUSH_INTERVAL,
+    ):
+        self._flush = flush
+        self._batch_size = max(batch_size, 1)
+        self._flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "_PageBatchWriter":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._task.cancel()
+            # The error that aborted the producer is already propagating, so
+            # a flush error the writer died with is not raised over it
+            with suppress(asyncio.CancelledError, Exception):
+                await self._task
+            discarded = self._queue.qsize()
+            if discarded:
+                logger.warning(f"Discarded {discarded} queued pages after an error")
+            return
+        await self._queue.put(None)
+        await self._task
+
+    async def put(self, page_data: Dict[str, Any]):
+        """Queue a page for the next bulk insert."""
+        if self._task.done():
+            # Surface the flush error instead of queueing into a dead writer
+            self._task.result()
+        await self._queue.put(page_data)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        finished = False
+        while not finished:
+            page_data = await self._queue.get()
+            if page_data is None:
+                break
+
+            batch = [page_data]
+            deadline = loop.time() + self._flush_interval
+            while len(batch) < self._batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    page_data = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if page_data is None:
+                    finished = True
+                    break
+                batch.append(page_data)
+
+            await self._flush(batch)
+
+
+def _drain_url_entries(parser: etree.XMLPullParser) -> Iterator[Dict[str, Any]]:
+    """Yield parsed <url> and <sitemap> entries, freeing each once it is read."""
+    for _, element in parser.read_events():
+        entry = {
+            "loc": (element.findtext("{*}loc") or "").strip(),
+            "lastmod": element.findtext("{*}lastmod"),
+            "changefreq": element.findtext("{*}changefreq"),
+            # <sitemap> entries of a sitemap index point to nested sitemaps
+            "is_sitemap": etree.QName(element).localname == "sitemap",
+        }
+
+        # Drop the element and its already-parsed siblings so the tree never
+        # grows beyond a single entry node
+        element.clear(keep_tail=True)
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+        if entry["loc"]:
+            yield entry
+
+
+async def iter_sitemap_entries(
+    chunks: AsyncIterator[bytes],
+    parse_errors: Optional[List[str]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream entries from sitemap XML without buffering the document.
+
+    Malformed sitemaps (unescaped ampersands, truncated files) are parsed in
+    recovery mode so the readable entries are still returned; the recovered
+    errors are appended to parse_errors when given. After the first error
+    libxml2 only reports the remaining entries once the document is closed.
+    """
+    parser = etree.XMLPullParser(
+        events=("end",),
+        tag=("{*}url", "{*}sitemap"),
+        recover=True,
+        resolve_entities=False,
+        huge_tree=False,
+    )
+
+    async for chunk in chunks:
+        parser.feed(chunk)
+        for entry in _drain_url_entries(parser):
+            yield entry
+
+    parser.close()
+    for entry in _drain_url_entries(parser):
+        yield entry
+
+    if parser.feed_error_log:
+        logger.warning(
+            f"Recovered from {len(parser.feed_error_log)} sitemap parse errors"
+        )
+        if parse_errors is not None:
+            parse_errors.extend(error.message for error in parser.feed_error_log)
+
+
+async def _abatched(
+    items: AsyncIterator[Dict[str, Any]], size: int
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Group an async iterator into lists of at most size items."""
+    batch: List[Dict[str, Any]] = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
 
 class ScrapyManager:
     """Manages Scrapy-based sitemap scraping operations."""
@@ -28,7 +408,14 @@ class ScrapyManager:
         self.embedding_generator = EmbeddingGenerator(
             config_manager.get_embedding_config()
         )
-        self.operations: Dict[str, Dict[str, Any]] = {}
+        self.operations: Dict[str, Operation] = {}
+        # Operations in start order, so recent ones are read from the end
+        self._operations_by_time: deque[Operation] = deque()
+        # Bound concurrent operations per host and operation starts overall
+        self._domain_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._task_limiter = _RateLimiter(
+            config_manager.get_max_tasks_per_minute()
+        )
 
     async def scrape_sitemap(
         self,
@@ -41,20 +428,20 @@ class ScrapyManager:
         operation_id = str(uuid.uuid4())
 
         # Initialize operation
-        self.operations[operation_id] = {
-            "id": operation_id,
-            "url": url,
-            "status": "running",
-            "progress": 0,
-            "started_at": datetime.now().isoformat(),
-            "incremental": incremental,
-            "differential": differential,
-            "config": config or {},
-            "error": None,
-        }
+        self._add_operation(
+            Operation(
+                id=operation_id,
+                url=url,
+                incremental=incremental,
+                differential=differential,
+                config=config or {},
+            )
+        )
 
         # Start scraping in background
-        asyncio.create_task(self._run_scraping_operation(operation_id))
+        asyncio.create_task(
+            self._run_throttled(operation_id, self._run_scraping_operation)
+        )
 
         return operation_id
 
@@ -69,37 +456,76 @@ class ScrapyManager:
         operation_id = str(uuid.uuid4())
 
         # Initialize operation
-        self.operations[operation_id] = {
-            "id": operation_id,
-            "url": url,
-            "status": "running",
-            "progress": 0,
-            "started_at": datetime.now().isoformat(),
-            "incremental": incremental,
-            "differential": differential,
-            "config": config or {},
-            "error": None,
-            "type": "update",
-        }
+        self._add_operation(
+            Operation(
+                id=operation_id,
+                url=url,
+                incremental=incremental,
+                differential=differential,
+                config=config or {},
+                type="update",
+            )
+        )
 
         # Start update in background
-        asyncio.create_task(self._run_update_operation(operation_id))
+        asyncio.create_task(
+            self._run_throttled(operation_id, self._run_update_operation)
+        )
 
         return operation_id
 
+    async def aclose(self):
+        """Release the shared HTTP clients; await before the event loop stops."""
+        await aclose_shared_client()
+
     async def get_operation_status(self, operation_id: str) -> Dict[str, Any]:
         """Get status of a specific operation."""
         if operation_id not in self.operations:
             raise ValueError(f"Operation {operation_id} not found")
 
-        return self.operations[operation_id].copy()
+        return self.operations[operation_id].to_dict()
 
     async def get_recent_operations(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get recent operations."""
-        sorted_operations = sorted(
-            self.operations.values(), key=lambda x: x["started_at"], reverse=True
+        """Get recent operations, newest first."""
+        if limit <= 0:
+            return []
+        return [
+            operation.to_dict()
+            for operation in itertools.islice(
+                reversed(self._operations_by_time), limit
+            )
+        ]
+
+    def _add_operation(self, operation: Operation):
+        """Register a new operation, dropping the oldest finished ones."""
+        self.operations[operation.id] = operation
+        self._operations_by_time.append(operation)
+
+        # Running operations are still referenced by their tasks, so history
+        # is only trimmed up to the oldest one that has not finished
+        while (
+            len(self._operations_by_time) > MAX_OPERATION_HISTORY
+            and self._operations_by_time[0].status != "running"
+        ):
+            del self.operations[self._operations_by_time.popleft().id]
+
+    async def _run_throttled(
+        self, operation_id: str, run: Callable[[str], Awaitable[None]]
+    ):
+        """Run an operation within the per-domain and per-minute limits."""
+        domain = self.config_manager.get_sitemap_domain(
+            self.operations[operation_id].url
         )
-        return sorted_operations[:limit]
+        semaphore = self._domain_semaphores.get(domain)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(
+                max(self.config_manager.get_per_domain_max_concurrency(), 1)
+            )
+            self._domain_semaphores[domain] = semaphore
+
+        async with semaphore:
+            await self._task_limiter.acquire()
+            await run(operation_id)
 
     async def _run_scraping_operation(self, operation_id: str):
         """Run the actual scraping operation."""
@@ -107,16 +533,16 @@ class ScrapyManager:
 
         try:
             logger.info(
-                f"Starting scraping operation {operation_id} for {operation['url']}"
+                f"Starting scraping operation {operation_id} for {operation.url}"
             )
 
             # Update progress
-            operation["progress"] = 10
+            operation.progress = 10
 
             # Check if sitemap exists
-            existing_sitemap = await self.supabase.get_sitemap_by_url(operation["url"])
+            existing_sitemap = await self.supabase.get_sitemap_by_url(operation.url)
 
-            if existing_sitemap and operation["incremental"]:
+            if existing_sitemap and operation.incremental:
                 # Incremental update
                 await self._run_incremental_update(operation_id, existing_sitemap)
             else:
@@ -124,17 +550,17 @@ class ScrapyManager:
                 await self._run_full_scrape(operation_id)
 
             # Mark as completed
-            operation["status"] = "completed"
-            operation["progress"] = 100
-            operation["completed_at"] = datetime.now().isoformat()
+            operation.status = "completed"
+            operation.progress = 100
+            operation.completed_at = time.time()
 
             logger.info(f"Scraping operation {operation_id} completed successfully")
 
         except Exception as e:
             logger.error(f"Scraping operation {operation_id} failed: {e}")
-            operation["status"] = "failed"
-            operation["error"] = str(e)
-            operation["completed_at"] = datetime.now().isoformat()
+            operation.status = "failed"
+            operation.error = str(e)
+            operation.completed_at = time.time()
 
     async def _run_update_operation(self, operation_id: str):
         """Run update operation."""
@@ -142,40 +568,40 @@ class ScrapyManager:
 
         try:
             logger.info(
-                f"Starting update operation {operation_id} for {operation['url']}"
+                f"Starting update operation {operation_id} for {operation.url}"
             )
 
             # Get existing sitemap
-            existing_sitemap = await self.supabase.get_sitemap_by_url(operation["url"])
+            existing_sitemap = await self.supabase.get_sitemap_by_url(operation.url)
             if not existing_sitemap:
-                raise ValueError(f"Sitemap {operation['url']} not found in database")
+                raise ValueError(f"Sitemap {operation.url} not found in database")
 
-            if operation["differential"]:
+            if operation.differential:
                 await self._run_differential_update(operation_id, existing_sitemap)
             else:
                 await self._run_incremental_update(operation_id, existing_sitemap)
 
             # Mark as completed
-            operation["status"] = "completed"
-            operation["progress"] = 100
-            operation["completed_at"] = datetime.now().isoformat()
+            operation.status = "completed"
+            operation.progress = 100
+            operation.completed_at = time.time()
 
             logger.info(f"Update operation {operation_id} completed successfully")
 
         except Exception as e:
             logger.error(f"Update operation {operation_id} failed: {e}")
-            operation["status"] = "failed"
-            operation["error"] = str(e)
-            operation["completed_at"] = datetime.now().isoformat()
+            operation.status = "failed"
+            operation.error = str(e)
+            operation.completed_at = time.time()
 
     async def _run_full_scrape(self, operation_id: str):
         """Run full sitemap scraping."""
         operation = self.operations[operation_id]
-        url = operation["url"]
-        config = operation["config"]
+        url = operation.url
+        config = operation.config
 
         # Update progress
-        operation["progress"] = 20
+        operation.progress = 20
 
         # Create sitemap record
         sitemap_data = {
@@ -188,11 +614,13 @@ class ScrapyManager:
         sitemap_record = await self.supabase.create_sitemap_record(sitemap_data)
 
         # Update progress
-        operation["progress"] = 30
+        operation.progress = 30
+
+        if self._simulation_enabled():
+            await self._simulate_scraping(operation_id, sitemap_record["id"])
+            return
 
-        # TODO: Implement actual Scrapy scraping
-        # For now, we'll simulate the process
-        await self._simulate_scraping(operation_id, sitemap_record["id"])
+        await self._scrape_pages(operation_id, sitemap_record["id"])
 
     async def _run_incremental_update(
         self, operation_id: str, existing_sitemap: Dict[str, Any]
@@ -201,37 +629,331 @@ class ScrapyManager:
         operation = self.operations[operation_id]
 
         # Update progress
-        operation["progress"] = 40
+        operation.progress = 40
+
+        if self._simulation_enabled():
+            await self._simulate_incremental_update(
+                operation_id, existing_sitemap["id"]
+            )
+            return
+
+        await self._scrape_pages(
+            operation_id, existing_sitemap["id"], incremental=True
+        )
+
+    async def _scrape_pages(
+        self,
+        operation_id: str,
+        sitemap_id: str,
+        incremental: bool = False,
+        filters: Optional[List[str]] = None,
+    ):
+        """Fetch, embed and store the pages listed in a sitemap.
+
+        Pages are fetched concurrently by an autoscaled pool, paced to the
+        configured requests per second. For incremental runs, stored pages
+        are looked up in bulk per batch of sitemap URLs, revalidated with
+        conditional requests and only re-embedded when their content changed.
+        """
+        operation = self.operations[operation_id]
+        config = operation.config
+        start_progress = operation.progress
+
+        max_pages = config.get("max_pages", self.config_manager.get_max_pages())
+        if filters is None:
+            filters = config.get("filters", [])
+        desired_concurrency = config.get(
+            "desired_concurrency", self.config_manager.get_desired_concurrency()
+        )
+        request_limiter = _RateLimiter(
+            self.config_manager.get_requests_per_second(), period=1.0
+        )
+        processed = 0
+        unchanged = 0
+        parse_errors: List[str] = []
+
+        batch_size = self.config_manager.get_write_batch_size()
+
+        async with self._http_client() as client, _PageBatchWriter(
+            self._store_new_pages, batch_size
+        ) as writer:
 
-        # TODO: Implement incremental update logic
-        # 1. Get existing pages
-        # 2. Check for changes using content hashes
-        # 3. Update only changed pages
+            async def process(item):
+                nonlocal processed, unchanged
+                entry, existing_page = item
 
-        await self._simulate_incremental_update(operation_id, existing_sitemap["id"])
+                await request_limiter.acquire()
+                try:
+                    page_data = await self._fetch_page(
+                        client, entry, sitemap_id, existing_page
+                    )
+                except httpx.HTTPError as e:
+                    logger.warning(f"Failed to fetch {entry['loc']}: {e}")
+                    return
+
+                if page_data is None:
+                    unchanged += 1
+                elif existing_page is not None and (
+                    existing_page.get("content_hash") == page_data["content_hash"]
+                    or _is_near_duplicate(
+                        (existing_page.get("metadata") or {}).get("simhash"),
+                        page_data["metadata"]["simhash"],
+                    )
+                ):
+                    # Same or nearly the same text as stored, only refresh the
+                    # HTTP validators. The stored fingerprint is kept so small
+                    # edits cannot accumulate unnoticed.
+                    unchanged += 1
+                    metadata = page_data["metadata"]
+                    stored_simhash = (existing_page.get("metadata") or {}).get("simhash")
+                    if stored_simhash:
+                        metadata["simhash"] = stored_simhash
+                    await self.supabase.update_document(
+                        existing_page["id"], {"metadata": metadata}
+                    )
+                elif existing_page is None:
+                    # New pages are embedded together when the batch is stored
+                    await writer.put(page_data)
+                else:
+                    page_data["embedding"] = (
+                        await self.embedding_generator.generate_content_embedding(
+                            page_data["content"]
+                        )
+                    )
+                    await self._update_page(existing_page["id"], page_data)
+
+                processed += 1
+
+            def publish_progress():
+                operation.pages_processed = processed
+                operation.pages_unchanged = unchanged
+                operation.parse_errors = len(parse_errors)
+                operation.progress = start_progress + int(
+                    (90 - start_progress) * processed / max(max_pages, 1)
+                )
+
+            async def report_progress():
+                # Workers only bump counters; this task is the single writer
+                # of the operation state and coalesces their updates
+                while True:
+                    await asyncio.sleep(PROGRESS_UPDATE_INTERVAL)
+                    publish_progress()
+
+            async def pages():
+                async with aclosing(
+                    self._iter_page_entries(
+                        client, operation.url, filters, max_pages, parse_errors
+                    )
+                ) as entries:
+                    async for entry_batch in _abatched(entries, URL_LOOKUP_BATCH_SIZE):
+                        existing_pages = (
+                            await self.supabase.get_documents_by_urls(
+                                [entry["loc"] for entry in entry_batch],
+                                source_id=sitemap_id,
+                            )
+                            if incremental
+                            else {}
+                        )
+                        for entry in entry_batch:
+                            yield entry, existing_pages.get(entry["loc"])
+
+            pool = _AutoscaledPool(
+                process,
+                desired_concurrency=desired_concurrency,
+                max_memory_bytes=self.config_manager.get_max_memory_mb() * 1024 * 1024,
+            )
+            reporter = asyncio.create_task(report_progress())
+            try:
+                async with aclosing(pages()) as items:
+                    await pool.run(items)
+            finally:
+                reporter.cancel()
+                with suppress(asyncio.CancelledError):
+                    await reporter
+
+        publish_progress()
+        operation.progress = 90
+
+    async def _store_new_pages(
+        self, pages: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Embed a batch of new pages with one request and store them in bulk."""
+        embeddings = await self.embedding_generator.generate_content_embeddings_batch(
+            [page["content"] for page in pages]
+        )
+        for page, embedding in zip(pages, embeddings):
+            page["embedding"] = embedding
+        return await self.supabase.create_web_page_records(pages)
+
+    async def _update_page(self, document_id: str, page_data: Dict[str, Any]):
+        """Update the stored document of a page that changed."""
+        await self.supabase.update_document(
+            document_id,
+            {
+                "title": page_data["title"],
+                "content": page_data["content"],
+                "content_preview": page_data["content_preview"],
+                "content_hash": page_data["content_hash"],
+                "metadata": page_data["metadata"],
+                "embedding": page_data["embedding"],
+            },
+        )
+
+    def _http_client(self) -> httpx.AsyncClient:
+        """Create the HTTP client used to fetch sitemaps and pages."""
+        return httpx.AsyncClient(
+            http2=_HTTP2_AVAILABLE,
+            verify=self.config_manager.get_processing_config()["verify_ssl"],
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=MAX_PAGE_CONCURRENCY,
+                max_connections=MAX_PAGE_CONCURRENCY,
+            ),
+            timeout=30.0,
+        )
+
+    async def _iter_sitemap_urls(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        parse_errors: Optional[List[str]] = None,
+        depth: int = 0,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the URL entries of a sitemap as the response body arrives.
+
+        Nested sitemaps of a sitemap index are fetched lazily when reached.
+        """
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            async with aclosing(
+                iter_sitemap_entries(response.aiter_bytes(), parse_errors)
+            ) as entries:
+                async for entry in entries:
+                    if not entry["is_sitemap"]:
+                        yield entry
+                    elif depth >= MAX_SITEMAP_DEPTH:
+                        logger.warning(
+                            f"Skipping nested sitemap {entry['loc']}: too deeply nested"
+                        )
+                    else:
+                        async with aclosing(
+                            self._iter_sitemap_urls(
+                                client, entry["loc"], parse_errors, depth + 1
+                            )
+                        ) as nested_entries:
+                            async for nested_entry in nested_entries:
+                                yield nested_entry
+
+    async def _iter_page_entries(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        filters: List[str],
+        max_pages: int,
+        parse_errors: Optional[List[str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream at most max_pages sitemap entries matching the path filters."""
+        if max_pages <= 0:
+            return
+
+        count = 0
+        async with aclosing(
+            self._iter_sitemap_urls(client, url, parse_errors)
+        ) as entries:
+            async for entry in entries:
+                if filters and not any(
+                    urlparse(entry["loc"]).path.startswith(f) for f in filters
+                ):
+                    continue
+                yield entry
+                count += 1
+                if count >= max_pages:
+                    break
+
+    async def _fetch_page(
+        self,
+        client: httpx.AsyncClient,
+        entry: Dict[str, Any],
+        sitemap_id: str,
+        existing_page: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch a page listed in the sitemap and extract its text content.
+
+        Returns None when a previously stored page is reported as not modified.
+        """
+        page_url = entry["loc"]
+
+        headers = {}
+        if existing_page is not None:
+            metadata = existing_page.get("metadata") or {}
+            if metadata.get("etag"):
+                headers["If-None-Match"] = metadata["etag"]
+            if metadata.get("last_modified"):
+                headers["If-Modified-Since"] = metadata["last_modified"]
+
+        response = await client.get(page_url, headers=headers)
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            return None
+        response.raise_for_status()
+
+        soup = BeautifulSoup(response.text, "html.parser")
+        title = soup.title.get_text(strip=True) if soup.title else page_url
+        for element in soup(NON_CONTENT_TAGS):
+            element.decompose()
+        content = soup.get_text(" ", strip=True)
+
+        return {
+            "sitemap_id": sitemap_id,
+            "url": page_url,
+            "title": title,
+            "content": content,
+            "content_preview": content[:CONTENT_PREVIEW_LENGTH],
+            "content_hash": hashlib.blake2b(
+                content.encode(), digest_size=16
+            ).hexdigest(),
+            "domain": self.config_manager.get_sitemap_domain(page_url),
+            "metadata": {
+                "lastmod": entry.get("lastmod"),
+                "changefreq": entry.get("changefreq"),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "simhash": f"{simhash(content):016x}",
+            },
+        }
 
     async def _run_differential_update(
         self, operation_id: str, existing_sitemap: Dict[str, Any]
     ):
         """Run differential update for specific sections."""
         operation = self.operations[operation_id]
-        config = operation["config"]
+        config = operation.config
 
         # Update progress
-        operation["progress"] = 50
+        operation.progress = 50
 
         differential_sections = config.get("differential_sections", [])
         if not differential_sections:
             raise ValueError("No differential sections specified")
 
-        # TODO: Implement differential update logic
-        # 1. Filter pages by sections
-        # 2. Update only those sections
+        if self._simulation_enabled():
+            await self._simulate_differential_update(
+                operation_id, existing_sitemap["id"], differential_sections
+            )
+            return
 
-        await self._simulate_differential_update(
-            operation_id, existing_sitemap["id"], differential_sections
+        # Revalidate only the pages below the requested section paths
+        await self._scrape_pages(
+            operation_id,
+            existing_sitemap["id"],
+            incremental=True,
+            filters=differential_sections,
         )
 
+    @staticmethod
+    def _simulation_enabled() -> bool:
+        """Check whether operations should run the simulated paths (demos only)."""
+        return os.getenv("TAHECHO_SIMULATE") == "1"
+
     async def _simulate_scraping(self, operation_id: str, sitemap_id: str):
         """Simulate scraping process for testing."""
         operation = self.operations[operation_id]
@@ -239,13 +961,13 @@ class ScrapyManager:
         # Simulate progress updates
         for progress in range(40, 90, 10):
             await asyncio.sleep(1)  # Simulate work
-            operation["progress"] = progress
+            operation.progress = progress
 
         # Simulate creating some web pages
         sample_pages = [
             {
                 "sitemap_id": sitemap_id,
-                "url": f"{operation['url']}/page1",
+                "url": f"{operation.url}/page1",
                 "title": "Sample Page 1",
                 "content": "This is sample content for page 1.",
                 "content_preview": "This is sample content...",
@@ -253,7 +975,7 @@ class ScrapyManager:
             },
             {
                 "sitemap_id": sitemap_id,
-                "url": f"{operation['url']}/page2",
+                "url": f"{operation.url}/page2",
                 "title": "Sample Page 2",
                 "content": "This is sample content for page 2.",
                 "content_preview": "This is sample content...",
@@ -264,7 +986,7 @@ class ScrapyManager:
         for page_data in sample_pages:
             await self.supabase.create_web_page_record(page_data)
 
-        operation["progress"] = 90
+        operation.progress = 90
 
     async def _simulate_incremental_update(self, operation_id: str, sitemap_id: str):
         """Simulate incremental update process."""
@@ -273,7 +995,7 @@ class ScrapyManager:
         # Simulate progress updates
         for progress in range(60, 90, 10):
             await asyncio.sleep(0.5)  # Simulate work
-            operation["progress"] = progress
+            operation.progress = progress
 
         # Simulate updating one page
         existing_pages = await self.supabase.get_sitemap_pages(sitemap_id, limit=1)
@@ -282,11 +1004,11 @@ class ScrapyManager:
             updated_content = f"{page['content']} (Updated at {datetime.now()})"
             new_embedding = [0.3] * 1536  # Dummy embedding
 
-            await self.supabase.update_web_page_content(
-                page["id"], updated_content, new_embedding
+            await self.supabase.update_document(
+                page["id"], {"content": updated_content, "embedding": new_embedding}
             )
 
-        operation["progress"] = 90
+        operation.progress = 90
 
     async def _simulate_differential_update(
         self, operation_id: str, sitemap_id: str, sections: List[str]
@@ -297,9 +1019,9 @@ class ScrapyManager:
         # Simulate progress updates
         for progress in range(60, 90, 10):
             await asyncio.sleep(0.5)  # Simulate work
-            operation["progress"] = progress
+            operation.progress = progress
 
         # Simulate updating pages for specific sections
         logger.info(f"Updating sections: {sections}")
 
-        operation["progress"] = 90
+        operation.progress = 90
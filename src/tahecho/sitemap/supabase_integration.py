@@ -1,11 +1,13 @@
 """Supabase integration for sitemap data storage."""
 
 import asyncio
+import functools
 import hashlib
 import logging
 import warnings
 from typing import Any, Dict, List, Optional
 
+import numpy as np
 from supabase import Client, create_client
 
 # Suppress GoTrue client cleanup warnings
@@ -13,6 +15,35 @@ warnings.filterwarnings("ignore", message=".*_refresh_token_timer.*")
 
 logger = logging.getLogger(__name__)
 
+# PostgREST and Postgres error codes for an RPC function that does not exist
+MISSING_FUNCTION_ERROR_CODES = ("PGRST202", "42883")
+
+
+@functools.lru_cache(maxsize=None)
+def _make_client(url: str, anon_key: str) -> Client:
+    """Create the Supabase client for a project, shared across integrations.
+
+    Failed attempts are not cached, so a later integration retries.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return create_client(url, anon_key)
+
+
+def _embedding_to_list(embedding: Any) -> Any:
+    """Convert NumPy embeddings to plain lists for JSON serialization."""
+    if isinstance(embedding, np.ndarray):
+        return embedding.tolist()
+    return embedding
+
+
+def _is_missing_function_error(error: Exception) -> bool:
+    """Check whether an RPC failed because the database function is missing."""
+    code = getattr(error, "code", None)
+    if code in MISSING_FUNCTION_ERROR_CODES:
+        return True
+    return any(missing in str(error) for missing in MISSING_FUNCTION_ERROR_CODES)
+
 
 class SupabaseIntegration:
     """Handles Supabase operations for sitemap data."""
@@ -25,12 +56,8 @@ class SupabaseIntegration:
         self.client = None  # Initialize client as None by default (mock mode)
 
         try:
-            import warnings
-
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                self.client: Client = create_client(url, anon_key)
-                logger.info("Supabase client initialized successfully")
+            self.client: Client = _make_client(url, anon_key)
+            logger.info("Supabase client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Supabase client: {e}")
             logger.warning("Using mock mode for Supabase operations")
@@ -40,6 +67,9 @@ class SupabaseIntegration:
             self.client = None
 
         self.embedding_dimension = 1536  # OpenAI text-embedding-3-small dimension
+        # Search through match_documents_half until the schema turns out to
+        # predate the halfvec column
+        self.use_half_precision_search = True
 
     async def create_document(self, document_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new document record."""
@@ -58,6 +88,10 @@ class SupabaseIntegration:
                     raise ValueError(
                         f"Embedding dimension {len(embedding)} does not match expected {self.embedding_dimension}"
                     )
+                document_data = {
+                    **document_data,
+                    "embedding": _embedding_to_list(embedding),
+                }
 
             response = self.client.table("documents").insert(document_data).execute()
 
@@ -71,6 +105,52 @@ class SupabaseIntegration:
             logger.error(f"Failed to create document: {e}")
             raise
 
+    async def create_documents_bulk(
+        self, documents: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Create several document records with a single insert request."""
+        if not documents:
+            return []
+
+        if self.client is None:
+            import uuid
+
+            logger.info(f"Mock: Created {len(documents)} document records")
+            return [{"id": str(uuid.uuid4()), **document} for document in documents]
+
+        try:
+            rows = list(documents)
+            embedded = [i for i, document in enumerate(rows) if "embedding" in document]
+            if embedded:
+                # Validate all embedding dimensions with one shape check and
+                # convert the batch to lists in a single call
+                try:
+                    embeddings = np.stack(
+                        [np.asarray(rows[i]["embedding"], dtype=np.float32) for i in embedded]
+                    )
+                except ValueError as e:
+                    raise ValueError(
+                        f"Embeddings do not share the expected dimension {self.embedding_dimension}"
+                    ) from e
+                if embeddings.shape != (len(embedded), self.embedding_dimension):
+                    raise ValueError(
+                        f"Embedding dimension {embeddings.shape[-1]} does not match expected {self.embedding_dimension}"
+                    )
+                for i, embedding in zip(embedded, embeddings.tolist()):
+                    rows[i] = {**rows[i], "embedding": embedding}
+
+            response = self.client.table("documents").insert(rows).execute()
+
+            if response.data:
+                logger.info(f"Created {len(response.data)} documents")
+                return response.data
+            else:
+                raise Exception("No data returned from bulk document creation")
+
+        except Exception as e:
+            logger.error(f"Failed to create documents in bulk: {e}")
+            raise
+
     async def search_similar_documents(
         self,
         query_embedding: List[float],
@@ -97,17 +177,41 @@ class SupabaseIntegration:
             if source_types:
                 query = query.in_("source_type", source_types)
 
-            # Add vector similarity search
-            query = query.rpc(
-                "match_documents",
-                {
-                    "query_embedding": query_embedding,
-                    "match_threshold": similarity_threshold,
-                    "match_count": limit,
-                },
-            )
-
-            response = query.execute()
+            # Add vector similarity search, preferring the half-precision index
+            use_half_precision = self.use_half_precision_search
+            if use_half_precision:
+                try:
+                    response = query.rpc(
+                        "match_documents_half",
+                        {
+                            "query_embedding": np.asarray(
+                                query_embedding, dtype=np.float16
+                            ).tolist(),
+                            "match_threshold": similarity_threshold,
+                            "match_count": limit,
+                        },
+                    ).execute()
+                except Exception as e:
+                    use_half_precision = False
+                    if _is_missing_function_error(e):
+                        logger.warning(
+                            f"Half-precision search unavailable, using full precision: {e}"
+                        )
+                        self.use_half_precision_search = False
+                    else:
+                        logger.warning(
+                            f"Half-precision search failed, retrying with full precision: {e}"
+                        )
+
+            if not use_half_precision:
+                response = query.rpc(
+                    "match_documents",
+                    {
+                        "query_embedding": _embedding_to_list(query_embedding),
+                        "match_threshold": similarity_threshold,
+                        "match_count": limit,
+                    },
+                ).execute()
 
             if response.data:
                 logger.info(f"Found {len(response.data)} similar documents")
@@ -139,6 +243,40 @@ class SupabaseIntegration:
             logger.error(f"Failed to get document by URL: {e}")
             return None
 
+    async def get_documents_by_urls(
+        self, urls: List[str], source_id: Optional[str] = None, chunk: int = 500
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get documents for many URLs at once, keyed by URL.
+
+        URLs are looked up in chunks because PostgREST encodes ``in_`` filters
+        in the request URL. Lookup errors are raised rather than returning a
+        partial result, which callers would take to mean the pages are new.
+        """
+        if self.client is None:
+            logger.info(f"Mock: No documents found for {len(urls)} URLs")
+            return {}
+
+        documents: Dict[str, Dict[str, Any]] = {}
+        try:
+            for i in range(0, len(urls), chunk):
+                query = (
+                    self.client.table("documents")
+                    .select("id,url,content_hash,metadata")
+                    .in_("url", urls[i : i + chunk])
+                )
+                if source_id:
+                    query = query.eq("source_id", source_id)
+
+                response = query.execute()
+                for row in response.data or []:
+                    documents[row["url"]] = row
+
+            return documents
+
+        except Exception as e:
+            logger.error(f"Failed to get documents by URLs: {e}")
+            raise
+
     async def get_documents_by_source(
         self, source_type: str, source_id: Optional[str] = None, limit: int = 100
     ) -> List[Dict[str, Any]]:
@@ -187,6 +325,7 @@ class SupabaseIntegration:
                     raise ValueError(
                         f"Embedding dimension {len(embedding)} does not match expected {self.embedding_dimension}"
                     )
+                update_data = {**update_data, "embedding": _embedding_to_list(embedding)}
 
             response = (
                 self.client.table("documents")
@@ -313,7 +452,20 @@ class SupabaseIntegration:
 
     async def create_web_page_record(self, page_data: Dict[str, Any]) -> Dict[str, Any]:
         """Legacy method: Create a web page record as a document."""
-        document_data = {
+        return await self.create_document(self._web_page_document(page_data))
+
+    async def create_web_page_records(
+        self, pages: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Create web page records as documents with a single insert request."""
+        return await self.create_documents_bulk(
+            [self._web_page_document(page_data) for page_data in pages]
+        )
+
+    @staticmethod
+    def _web_page_document(page_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map web page data onto the documents table shape."""
+        return {
             "title": page_data.get("title"),
             "url": page_data.get("url"),
             "content": page_data.get("content"),
@@ -327,7 +479,6 @@ class SupabaseIntegration:
             "embedding": page_data.get("embedding"),
             "tags": ["webpage", "sitemap"],
         }
-        return await self.create_document(document_data)
 
     async def get_sitemap_by_url(self, sitemap_url: str) -> Optional[Dict[str, Any]]:
         """Legacy method: Get sitemap document by URL."""
@@ -1,10 +1,13 @@
 import functools
 import logging
-import traceback
+import re
 from typing import Any, Callable
 
 logger = logging.getLogger(__name__)
 
+# Transient EngineIO/SocketIO errors, classified in a single scan
+_ENGINEIO_ERROR_RE = re.compile(r"engineio|socketio", re.IGNORECASE)
+
 
 def handle_engineio_errors(func: Callable) -> Callable:
     """
@@ -25,13 +28,14 @@ def handle_engineio_errors(func: Callable) -> Callable:
                 # Return a graceful error response
                 return {"error": "Connection issue detected, please try again"}
 
-            elif "engineio" in error_msg.lower() or "socketio" in error_msg.lower():
+            elif _ENGINEIO_ERROR_RE.search(error_msg):
                 logger.warning("EngineIO/SocketIO error (transient): %s", error_msg)
                 return {"error": "Connection issue detected, please try again"}
 
             # Re-raise other errors
-            logger.error("Unexpected error in %s: %s", func.__name__, error_msg)
-            logger.error("Traceback: %s", traceback.format_exc())
+            logger.error(
+                "Unexpected error in %s: %s", func.__name__, error_msg, exc_info=True
+            )
             raise
 
     return wrapper
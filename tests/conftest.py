@@ -3,7 +3,9 @@ Pytest configuration and fixtures for Tahecho tests.
 """
 
 import os
+import shutil
 import sys
+import tempfile
 from typing import Any, Dict
 from unittest.mock import Mock, patch
 
@@ -51,6 +53,16 @@ def mock_supabase_modules():
 # Apply mocks before other imports
 mock_supabase_modules()
 
+# Chainlit resolves its app root from the cwd at import time and writes
+# missing config/translation files there; keep those out of the repo
+_CHAINLIT_APP_ROOT = tempfile.mkdtemp(prefix="tahecho-chainlit-")
+os.environ.setdefault("CHAINLIT_APP_ROOT", _CHAINLIT_APP_ROOT)
+
+
+def pytest_unconfigure(config):
+    """Remove the temporary Chainlit app root."""
+    shutil.rmtree(_CHAINLIT_APP_ROOT, ignore_errors=True)
+
 
 # Mock configuration for testing
 @pytest.fixture(scope="session")
@@ -74,9 +86,9 @@ def mock_config():
     }
 
 
-@pytest.fixture(autouse=True)
+@pytest.fixture(autouse=True, scope="session")
 def mock_env_vars(mock_config):
-    """Mock environment variables for all tests."""
+    """Mock environment variables once for the whole test session."""
     with patch.dict(
         os.environ,
         {
@@ -97,6 +109,30 @@ def mock_config_module(mock_config):
         yield
 
 
+def _canned_llm_response(messages: Any) -> str:
+    """Pick a canned reply based on which prompt the model was sent."""
+    if "task classifier" in str(messages):
+        return '{"task_type": "general", "reasoning": "Canned test response"}'
+    return "This is a canned test response."
+
+
+@pytest.fixture
+def mock_openai_llm():
+    """Answer ChatOpenAI calls with canned replies instead of hitting the network."""
+    from langchain_core.messages import AIMessage
+
+    def invoke(self, messages, *args, **kwargs):
+        return AIMessage(content=_canned_llm_response(messages))
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        return invoke(self, messages)
+
+    with patch("langchain_openai.ChatOpenAI.invoke", invoke), patch(
+        "langchain_openai.ChatOpenAI.ainvoke", ainvoke
+    ):
+        yield
+
+
 @pytest.fixture
 def mock_openai_client():
     """Mock OpenAI client."""
@@ -4,10 +4,72 @@ End-to-end tests for the dynamic license filter functionality using Playwright.
 These tests simulate real user interactions in a browser.
 """
 
-import pytest
+import functools
 import json
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict, Iterator
+
+import pytest
+import pytest_asyncio
+from playwright.async_api import BrowserContext, Page, async_playwright, expect
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+async def stable_read(page: Page, predicate_js: str, arg: Any = None) -> None:
+    """Wait until the network is idle and predicate_js holds in the page."""
+    await page.wait_for_load_state("networkidle")
+    await page.wait_for_function(predicate_js, arg=arg)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler that keeps request logs out of the test output."""
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture(scope="session")
+def server_url() -> Iterator[str]:
+    """Serve the project root on a free port, one server per (xdist) worker."""
+    handler = functools.partial(_QuietHandler, directory=str(PROJECT_ROOT))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def browser_context() -> AsyncIterator[BrowserContext]:
+    """Launch Chromium once and share a single browser context across tests."""
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch()
+        context = await browser.new_context()
+        yield context
+        await context.close()
+        await browser.close()
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def page(browser_context: BrowserContext) -> AsyncIterator[Page]:
+    """Open a fresh page in the shared context, clearing origin state afterwards.
+
+    Clearing cookies and web storage keeps tests isolated without paying for
+    a new browser context per test.
+    """
+    page = await browser_context.new_page()
+    yield page
+    if page.url.startswith("http"):
+        await page.evaluate("() => { localStorage.clear(); sessionStorage.clear(); }")
+    await browser_context.clear_cookies()
+    await page.close()
 
 
 @pytest.fixture(scope="session")
@@ -55,12 +117,24 @@ def test_sbom_data() -> Dict[str, Any]:
     }
 
 
-@pytest.mark.asyncio
-async def test_license_filter_real_interaction(page: Any, test_sbom_data: Dict[str, Any]) -> None:
+@pytest.fixture(scope="session")
+def test_sbom_path(test_sbom_data: Dict[str, Any]) -> Iterator[str]:
+    """Write the test SBOM into the served directory once per (xdist) worker."""
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    sbom_file = PROJECT_ROOT / "public" / f"test_sbom_{worker}.json"
+    sbom_file.write_text(json.dumps(test_sbom_data, indent=2))
+    try:
+        yield f"/public/{sbom_file.name}"
+    finally:
+        sbom_file.unlink(missing_ok=True)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_license_filter_real_interaction(page: Page, server_url: str, test_sbom_path: str) -> None:
     """Test the complete license filter workflow with real user interactions."""
     
     # Navigate to the page served by our HTTP server
-    await page.goto("http://localhost:8000/public/index.html")
+    await page.goto(f"{server_url}/public/index.html")
     
     # Wait for the page to load
     await page.wait_for_load_state("networkidle")
@@ -68,154 +142,82 @@ async def test_license_filter_real_interaction(page: Any, test_sbom_data: Dict[s
     # Verify the page loaded correctly
     await page.wait_for_selector("#load-sbom-btn")
     
-    # Create a test SBOM file that the page can actually load
-    sbom_file = Path("/Users/wolfgang.ihloff/workspace/tahecho/public/test_sbom.json")
-    with open(sbom_file, 'w') as f:
-        json.dump(test_sbom_data, f, indent=2)
-    
-    try:
-        # Modify the page to load our test SBOM instead of the regular one
-        await page.evaluate("""
+    # Modify the page to load our test SBOM instead of the regular one
+    await page.evaluate("""
+        (sbomPath) => {
             // Override the fetch to use our test data
             const originalFetch = window.fetch;
             window.fetch = async function(url) {
                 if (url.includes('sbom.json')) {
-                    return originalFetch('/public/test_sbom.json');
+                    return originalFetch(sbomPath);
                 }
                 return originalFetch(url);
             };
-        """)
-        
-        # Click the load SBOM button
-        await page.click("#load-sbom-btn")
-        
-        # Wait for the SBOM data to load and the components section to appear
-        await page.wait_for_selector("#components-section", state="visible")
-        
-        # Wait for the license filter to be populated
-        await page.wait_for_function("""
-            () => {
-                const select = document.getElementById('license-filter');
-                return select && select.options.length > 1; // More than just "All Licenses"
-            }
-        """)
-        
-        # Check that the license filter was populated with the expected licenses
-        license_options = await page.evaluate("""
-            () => {
-                const select = document.getElementById('license-filter');
-                return Array.from(select.options).map(option => ({
-                    value: option.value,
-                    text: option.text
-                }));
-            }
-        """)
-        
-        print(f"License options found: {license_options}")
-        
-        # Should have: All Licenses, MIT, Apache-2.0, BSD-3-Clause, Unknown/Not Specified
-        expected_licenses = {"", "MIT", "Apache-2.0", "BSD-3-Clause", "Unknown/Not Specified"}
-        actual_license_values = {option["value"] for option in license_options}
-        
-        assert expected_licenses.issubset(actual_license_values), f"Missing licenses. Expected {expected_licenses}, got {actual_license_values}"
-        
-        # Wait for table to be populated
-        await page.wait_for_selector("#components-tbody tr")
-        
-        # Get initial row count
-        initial_rows = await page.evaluate("""
-            () => document.querySelectorAll('#components-tbody tr').length
-        """)
-        
-        print(f"Initial table has {initial_rows} rows")
-        
-        # Test filtering by MIT
-        await page.select_option("#license-filter", "MIT")
-        
-        # Wait a moment for filtering to take effect
-        await page.wait_for_timeout(500)
-        
-        # Check which rows are visible after filtering
-        visible_rows = await page.evaluate("""
-            () => {
-                const rows = document.querySelectorAll('#components-tbody tr');
-                return Array.from(rows).map(row => ({
-                    license: row.getAttribute('data-license') || '',
-                    visible: window.getComputedStyle(row).display !== 'none' && row.style.display !== 'none',
-                    style_display: row.style.display,
-                    computed_display: window.getComputedStyle(row).display
-                }));
-            }
-        """)
-        
-        print(f"Rows after MIT filtering: {visible_rows}")
-        
-        # Count visible rows
-        visible_count = sum(1 for row in visible_rows if row['visible'])
-        print(f"Visible rows after MIT filter: {visible_count}")
-        
-        # Should show MIT rows (component-mit and component-pypi-enhanced)
-        mit_rows = [row for row in visible_rows if 'MIT' in row['license']]
-        non_mit_rows = [row for row in visible_rows if row['license'] and 'MIT' not in row['license']]
-        
-        print(f"MIT rows: {mit_rows}")
-        print(f"Non-MIT rows: {non_mit_rows}")
-        
-        # Test that MIT rows are visible
-        for row in mit_rows:
-            assert row['visible'], f"MIT row should be visible: {row}"
-        
-        # Test that non-MIT rows are hidden
-        for row in non_mit_rows:
-            assert not row['visible'], f"Non-MIT row should be hidden: {row}"
-        
-        # Test switching to "All Licenses" shows all rows again
-        await page.select_option("#license-filter", "")
-        await page.wait_for_timeout(500)
-        
-        all_visible_rows = await page.evaluate("""
-            () => {
-                const rows = document.querySelectorAll('#components-tbody tr');
-                return Array.from(rows).filter(row => 
-                    window.getComputedStyle(row).display !== 'none' && row.style.display !== 'none'
-                ).length;
-            }
-        """)
-        
-        print(f"Visible rows after 'All Licenses': {all_visible_rows}")
-        assert all_visible_rows == initial_rows, f"All rows should be visible again. Expected {initial_rows}, got {all_visible_rows}"
-        
-        # Test filtering by Apache-2.0
-        await page.select_option("#license-filter", "Apache-2.0")
-        await page.wait_for_timeout(500)
-        
-        apache_visible_rows = await page.evaluate("""
-            () => {
-                const rows = document.querySelectorAll('#components-tbody tr');
-                const visible = Array.from(rows).filter(row => 
-                    window.getComputedStyle(row).display !== 'none' && row.style.display !== 'none'
-                );
-                return visible.map(row => row.getAttribute('data-license') || '');
-            }
-        """)
-        
-        print(f"Visible licenses after Apache filter: {apache_visible_rows}")
-        
-        # Should only show Apache-2.0 rows
-        for license_name in apache_visible_rows:
-            assert 'Apache-2.0' in license_name, f"Only Apache rows should be visible, but found: {license_name}"
-        
-    finally:
-        # Clean up the test file
-        if sbom_file.exists():
-            sbom_file.unlink()
+        }
+    """, test_sbom_path)
+    
+    # Click the load SBOM button
+    await page.click("#load-sbom-btn")
+    
+    # Wait for the SBOM data to load and the license filter to be populated
+    # with more than just "All Licenses"
+    await stable_read(
+        page, "() => document.querySelector('#license-filter')?.options.length > 1"
+    )
+    
+    # Check in the page that the license filter offers All Licenses, MIT,
+    # Apache-2.0, BSD-3-Clause and Unknown/Not Specified; only the values that
+    # are missing come back over the wire
+    expected_licenses = ["", "MIT", "Apache-2.0", "BSD-3-Clause", "Unknown/Not Specified"]
+    missing_licenses = await page.evaluate("""
+        (expected) => {
+            const values = new Set(
+                Array.from(document.getElementById('license-filter').options, option => option.value)
+            );
+            return expected.filter(value => !values.has(value));
+        }
+    """, expected_licenses)
+
+    assert not missing_licenses, f"Missing licenses in filter: {missing_licenses}"
+
+    # Wait for table to be populated
+    rows = page.locator("#components-tbody tr")
+    await expect(rows.first).to_be_attached()
+
+    # Get initial row count
+    initial_rows = await rows.count()
+
+    print(f"Initial table has {initial_rows} rows")
+
+    # Test filtering by MIT: every MIT row stays visible (component-mit and
+    # component-pypi-enhanced) and every other row is hidden
+    await page.select_option("#license-filter", "MIT")
+
+    mit_rows = page.locator("#components-tbody tr[data-license*='MIT']")
+    mit_count = await mit_rows.count()
+    assert mit_count > 0, "Test SBOM should contain MIT rows"
+
+    await expect(page.locator("#components-tbody tr[data-license*='MIT']:visible")).to_have_count(mit_count)
+    await expect(page.locator("#components-tbody tr:not([data-license*='MIT']):visible")).to_have_count(0)
+
+    # Test switching to "All Licenses" shows all rows again
+    await page.select_option("#license-filter", "")
+
+    await expect(page.locator("#components-tbody tr:visible")).to_have_count(initial_rows)
+
+    # Test filtering by Apache-2.0: only Apache rows should be visible
+    await page.select_option("#license-filter", "Apache-2.0")
+
+    await expect(page.locator("#components-tbody tr[data-license*='Apache-2.0']:visible")).not_to_have_count(0)
+    await expect(page.locator("#components-tbody tr:not([data-license*='Apache-2.0']):visible")).to_have_count(0)
 
 
-@pytest.mark.asyncio
-async def test_license_filter_debugging(page: Any) -> None:
+@pytest.mark.diagnostic
+@pytest.mark.asyncio(loop_scope="session")
+async def test_license_filter_debugging(page: Page, server_url: str) -> None:
     """Debug test to understand what's happening with the license filter."""
     
-    await page.goto("http://localhost:8000/public/index.html")
+    await page.goto(f"{server_url}/public/index.html")
     await page.wait_for_load_state("networkidle")
     
     # Check if the filter exists but is hidden
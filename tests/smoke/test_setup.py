@@ -15,6 +15,9 @@ from dotenv import load_dotenv
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+# Keep the smoke tests hermetic: chat model calls get canned replies
+pytestmark = pytest.mark.usefixtures("mock_openai_llm")
+
 
 @pytest.mark.unit
 def test_environment_variables() -> None:
@@ -30,19 +33,16 @@ def test_environment_variables() -> None:
         "JIRA_API_TOKEN": "Jira API Token",
     }
 
-    missing_required = []
-
-    for var, description in required_vars.items():
-        value = os.getenv(var)
-        if not value:
-            missing_required.append(f"{description} ({var})")
-        else:
-            print(f"✅ {description}: {'*' * len(value)}")
+    missing_required = [
+        f"{description} ({var})"
+        for var, description in required_vars.items()
+        if not os.getenv(var)
+    ]
 
     if missing_required:
         pytest.fail(f"Missing required environment variables: {', '.join(missing_required)}")
 
-    print("✅ Environment variables test completed")
+    print(f"✅ Environment variables present: {', '.join(required_vars.values())}")
 
 
 @pytest.mark.unit
@@ -70,7 +70,7 @@ def test_chainlit_setup() -> None:
     """Test Chainlit setup."""
     print("\n🔍 Testing Chainlit Setup...")
 
-    import chainlit as cl
+    cl = pytest.importorskip("chainlit")
 
     print("✅ Chainlit import successful")
     assert cl is not None, "Chainlit should be importable"
@@ -82,6 +82,7 @@ def test_jira_integration() -> None:
     """Test Jira integration setup."""
     print("\n🔍 Testing Jira Integration...")
 
+    pytest.importorskip("atlassian")
     from tahecho.jira_integration.jira_client import JiraClient
 
     # Test client creation (without making actual requests)
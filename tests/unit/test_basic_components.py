@@ -8,6 +8,8 @@ import os
 import sys
 from unittest.mock import Mock, patch
 
+import pytest
+
 # Mock the config to avoid API key issues
 mock_config = {
     "OPENAI_API_KEY": "test_key",
@@ -56,26 +58,29 @@ def test_imports():
     from tahecho.agents.state import AgentState, create_initial_state
 
 
-def test_workflow_structure():
-    """Test the workflow structure without executing it."""
+@pytest.fixture(scope="module")
+def workflow():
+    """Workflow instance shared by the structure checks."""
     from tahecho.agents.langgraph_workflow import LangGraphWorkflow
 
-    # Create workflow instance
-    workflow = LangGraphWorkflow()
-
-    # Check that workflow has required components
-    assert hasattr(workflow, "workflow")
-    assert hasattr(workflow, "memory")
-    assert hasattr(workflow, "app")
+    return LangGraphWorkflow()
 
 
-def test_manager_agent_structure():
-    """Test the manager agent structure without executing it."""
+@pytest.fixture(scope="module")
+def manager():
+    """Manager agent instance shared by the structure checks."""
     from tahecho.agents.langchain_manager_agent import LangChainManagerAgent
 
-    # Create manager agent instance
-    manager = LangChainManagerAgent()
+    return LangChainManagerAgent()
+
 
-    # Check that manager has required components
-    assert hasattr(manager, "workflow")
-    assert hasattr(manager, "run")
+@pytest.mark.parametrize("attribute", ["workflow", "memory", "app"])
+def test_workflow_structure(workflow, attribute):
+    """Test the workflow structure without executing it."""
+    assert hasattr(workflow, attribute)
+
+
+@pytest.mark.parametrize("attribute", ["workflow", "run"])
+def test_manager_agent_structure(manager, attribute):
+    """Test the manager agent structure without executing it."""
+    assert hasattr(manager, attribute)
@@ -1,7 +1,10 @@
 import json
 import os
+import dataclasses
 from unittest.mock import patch
 
+import pytest
+
 from tahecho.sitemap.configuration_manager import ConfigurationManager
 
 
@@ -59,3 +62,64 @@ class TestConfigurationManager:
 
             assert embedding_config["model"] == "text-embedding-3-small"
             assert embedding_config["dimension"] == 1536
+
+    def test_settings_snapshot(self):
+        """Test that settings are loaded once into a frozen snapshot."""
+        with patch.dict(
+            os.environ,
+            {
+                "SITEMAP_AGENTS_ENABLED": "true",
+                "SUPABASE_URL": "https://test.supabase.co",
+                "SUPABASE_ANON_KEY": "test_key",
+                "SITEMAP_URLS": "https://a.example/sitemap.xml, ,https://b.example/sitemap.xml",
+                "SITEMAP_MAX_PAGES": "250",
+            },
+        ), patch("dotenv.load_dotenv"):
+            config_manager = ConfigurationManager()
+            settings = config_manager.settings
+
+            assert settings.sitemap_urls == (
+                "https://a.example/sitemap.xml",
+                "https://b.example/sitemap.xml",
+            )
+            assert config_manager.get_sitemap_urls() is settings.sitemap_urls
+            assert config_manager.get_max_pages() == settings.max_pages == 250
+            assert config_manager.get_write_batch_size() == 100
+            assert config_manager.get_processing_config()["batch_size"] == 10
+            with pytest.raises(dataclasses.FrozenInstanceError):
+                settings.max_pages = 1
+
+    def test_get_yaml_config_is_read_only(self, tmp_path):
+        """Test that the YAML configuration is exposed as a read-only view."""
+        config_path = tmp_path / "sitemaps.yaml"
+        config_path.write_text("sitemaps:\n  - https://example.com/sitemap.xml\n")
+
+        with patch.dict(os.environ, {"SITEMAP_AGENTS_ENABLED": "false"}), patch("dotenv.load_dotenv"):
+            config_manager = ConfigurationManager()
+            config_manager.load_yaml_config(str(config_path))
+            yaml_config = config_manager.get_yaml_config()
+
+            assert yaml_config["sitemaps"] == ["https://example.com/sitemap.xml"]
+            with pytest.raises(TypeError):
+                yaml_config["sitemaps"] = []
+
+    def test_get_throttle_settings(self):
+        """Test the concurrency and operation rate settings."""
+        with patch.dict(
+            os.environ,
+            {
+                "SITEMAP_AGENTS_ENABLED": "true",
+                "SUPABASE_URL": "https://test.supabase.co",
+                "SUPABASE_ANON_KEY": "test_key",
+                "SITEMAP_PER_DOMAIN_MAX_CONCURRENCY": "3",
+                "SITEMAP_MAX_TASKS_PER_MINUTE": "12",
+                "SITEMAP_DESIRED_CONCURRENCY": "5",
+                "SITEMAP_MAX_MEMORY_MB": "512",
+            },
+        ), patch("dotenv.load_dotenv"):
+            config_manager = ConfigurationManager()
+
+            assert config_manager.get_per_domain_max_concurrency() == 3
+            assert config_manager.get_max_tasks_per_minute() == 12
+            assert config_manager.get_desired_concurrency() == 5
+            assert config_manager.get_max_memory_mb() == 512
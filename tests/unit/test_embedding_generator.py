@@ -0,0 +1,207 @@
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import numpy as np
+import pytest
+
+from tahecho.sitemap import embedding_generator
+from tahecho.sitemap.embedding_generator import EmbeddingGenerator
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_client():
+    """Reset the shared OpenAI client between tests."""
+    embedding_generator._CLIENT = None
+    yield
+    embedding_generator._CLIENT = None
+
+
+class TestEmbeddingGenerator:
+    """Test cases for EmbeddingGenerator."""
+
+    def test_initialization(self):
+        """Test EmbeddingGenerator initialization."""
+        # Construction must not touch the client, so give it no attributes
+        with patch(
+            "tahecho.sitemap.embedding_generator.openai.AsyncOpenAI",
+            return_value=Mock(spec_set=[]),
+        ):
+            generator = EmbeddingGenerator(
+                {"model": "text-embedding-3-small", "dimension": 1536}
+            )
+
+            assert generator.model == "text-embedding-3-small"
+            assert generator.dimension == 1536
+
+    def test_client_shared_between_instances(self):
+        """Test that all generators reuse one OpenAI client."""
+        with patch(
+            "tahecho.sitemap.embedding_generator.openai.AsyncOpenAI"
+        ) as mock_openai:
+            mock_openai.return_value = Mock(spec_set=[])
+
+            first = EmbeddingGenerator({})
+            second = EmbeddingGenerator({})
+
+            assert first.client is second.client
+            mock_openai.assert_called_once()
+
+    async def test_aclose_shared_client(self):
+        """Test that closing awaits the client and lets the next generator get a new one."""
+        with patch(
+            "tahecho.sitemap.embedding_generator.openai.AsyncOpenAI"
+        ) as mock_openai:
+            mock_openai.side_effect = lambda **kwargs: Mock(close=AsyncMock())
+
+            first = EmbeddingGenerator({})
+            await embedding_generator.aclose_shared_client()
+            second = EmbeddingGenerator({})
+
+            first.client.close.assert_awaited_once()
+            assert second.client is not first.client
+
+        # Closing again without a client is a no-op
+        embedding_generator._CLIENT = None
+        await embedding_generator.aclose_shared_client()
+
+    async def test_generate_embeddings_batch_chunks_requests(self):
+        """Test that large batches are split into concurrent chunked requests."""
+        with patch(
+            "tahecho.sitemap.embedding_generator.openai.AsyncOpenAI"
+        ) as mock_openai:
+            mock_client = MagicMock()
+            mock_openai.return_value = mock_client
+
+            async def create(model, input, encoding_format):
+                return MagicMock(
+                    data=[MagicMock(embedding=[float(len(t))] * 4) for t in input]
+                )
+
+            mock_client.embeddings.create = AsyncMock(side_effect=create)
+
+            generator = EmbeddingGenerator({"dimension": 4})
+            texts = ["x" * i for i in range(200)]
+            embeddings = await generator.generate_embeddings_batch(texts)
+
+            assert mock_client.embeddings.create.await_count == 3
+            assert embeddings.shape == (200, 4)
+            assert embeddings.tolist() == [[float(len(t))] * 4 for t in texts]
+
+    async def test_generate_embedding_uses_cache(self):
+        """Test that identical texts are embedded only once."""
+        with patch(
+            "tahecho.sitemap.embedding_generator.openai.AsyncOpenAI"
+        ) as mock_openai:
+            mock_client = MagicMock()
+            mock_openai.return_value = mock_client
+            mock_client.embeddings.create = AsyncMock(
+                return_value=MagicMock(data=[MagicMock(embedding=[0.5] * 4)])
+            )
+
+            generator = EmbeddingGenerator({"dimension": 4})
+            first = await generator.generate_embedding("Sample Page")
+            second = await generator.generate_embedding("Sample Page")
+
+            assert first is second
+            assert first.dtype == np.float32
+            assert first.tolist() == [0.5] * 4
+            mock_client.embeddings.create.assert_awaited_once()
+
+    async def test_generate_embeddings_batch_only_embeds_uncached(self):
+        """Test that batches skip cached and duplicate texts."""
+        with patch(
+            "tahecho.sitemap.embedding_generator.openai.AsyncOpenAI"
+        ) as mock_openai:
+            mock_client = MagicMock()
+            mock_openai.return_value = mock_client
+
+            async def create(model, input, encoding_format):
+                return MagicMock(
+                    data=[MagicMock(embedding=[float(len(t))] * 4) for t in input]
+                )
+
+            mock_client.embeddings.create = AsyncMock(side_effect=create)
+
+            generator = EmbeddingGenerator({"dimension": 4})
+            await generator.generate_embeddings_batch(["aa"])
+            embeddings = await generator.generate_embeddings_batch(
+                ["aa", "bbb", "bbb", "c"]
+            )
+
+            assert embeddings.tolist() == [[2.0] * 4, [3.0] * 4, [3.0] * 4, [1.0] * 4]
+            last_call = mock_client.embeddings.create.await_args_list[-1]
+            assert last_call.kwargs["input"] == ["bbb", "c"]
+
+    async def test_generate_combined_embedding(self):
+        """Test weighting of title and content embeddings."""
+        with patch(
+            "tahecho.sitemap.embedding_generator.openai.AsyncOpenAI"
+        ) as mock_openai:
+            mock_client = MagicMock()
+            mock_openai.return_value = mock_client
+            mock_client.embeddings.create = AsyncMock(
+                side_effect=[
+                    MagicMock(data=[MagicMock(embedding=[1.0] * 4)]),
+                    MagicMock(data=[MagicMock(embedding=[0.0] * 4)]),
+                ]
+            )
+
+            generator = EmbeddingGenerator({"dimension": 4})
+            combined = await generator.generate_combined_embedding(
+                "Title", "Content", title_weight=0.25
+            )
+
+            assert generator.validate_embedding(combined)
+            assert combined.tolist() == [0.25] * 4
+
+    async def test_generate_content_embedding_truncates_by_tokens(self):
+        """Test that long content is cut to the token limit before embedding."""
+        with patch(
+            "tahecho.sitemap.embedding_generator.openai.AsyncOpenAI"
+        ) as mock_openai, patch(
+            "tahecho.sitemap.embedding_generator._get_encoding"
+        ) as mock_get_encoding:
+            mock_client = MagicMock()
+            mock_openai.return_value = mock_client
+            mock_client.embeddings.create = AsyncMock(
+                return_value=MagicMock(data=[MagicMock(embedding=[0.5] * 4)])
+            )
+            encoding = MagicMock()
+            encoding.encode.side_effect = lambda text: text.split()
+            encoding.decode.side_effect = lambda tokens: " ".join(tokens)
+            mock_get_encoding.return_value = encoding
+
+            generator = EmbeddingGenerator({"dimension": 4})
+            await generator.generate_content_embedding("one two three", max_tokens=2)
+
+            mock_client.embeddings.create.assert_awaited_once_with(
+                model=generator.model, input="one two", encoding_format="float"
+            )
+
+    async def test_generate_content_embeddings_batch_truncates_each_text(self):
+        """Test that batched contents are truncated and embedded in one request."""
+        with patch(
+            "tahecho.sitemap.embedding_generator.openai.AsyncOpenAI"
+        ) as mock_openai, patch(
+            "tahecho.sitemap.embedding_generator._get_encoding"
+        ) as mock_get_encoding:
+            mock_client = MagicMock()
+            mock_openai.return_value = mock_client
+            mock_client.embeddings.create = AsyncMock(
+                return_value=MagicMock(
+                    data=[MagicMock(embedding=[0.5] * 4), MagicMock(embedding=[0.25] * 4)]
+                )
+            )
+            encoding = MagicMock()
+            encoding.encode.side_effect = lambda text: text.split()
+            encoding.decode.side_effect = lambda tokens: " ".join(tokens)
+            mock_get_encoding.return_value = encoding
+
+            generator = EmbeddingGenerator({"dimension": 4})
+            embeddings = await generator.generate_content_embeddings_batch(
+                ["one two three", "four"], max_tokens=2
+            )
+
+            assert embeddings.shape == (2, 4)
+            mock_client.embeddings.create.assert_awaited_once_with(
+                model=generator.model, input=["one two", "four"], encoding_format="float"
+            )
@@ -10,7 +10,6 @@ from tahecho.utils.error_handling import handle_engineio_errors, setup_error_han
 class TestErrorHandling:
     """Test error handling functionality."""
 
-    @pytest.mark.asyncio
     async def test_engineio_error_handling(self):
         """Test that EngineIO errors are handled gracefully."""
 
@@ -26,7 +25,6 @@ class TestErrorHandling:
             assert result == {"error": "Connection issue detected, please try again"}
             mock_logger.warning.assert_called()
 
-    @pytest.mark.asyncio
     async def test_other_errors_still_raised(self):
         """Test that non-EngineIO errors are still raised."""
 
@@ -49,7 +47,6 @@ class TestErrorHandling:
             # Verify that logging levels were set
             mock_get_logger.assert_called()
 
-    @pytest.mark.asyncio
     async def test_engineio_socketio_error_handling(self):
         """Test that SocketIO errors are also handled."""
 
@@ -63,7 +60,6 @@ class TestErrorHandling:
             assert result == {"error": "Connection issue detected, please try again"}
             mock_logger.warning.assert_called()
 
-    @pytest.mark.asyncio
     async def test_normal_function_execution(self):
         """Test that normal functions work without errors."""
 
@@ -73,3 +69,52 @@ class TestErrorHandling:
 
         result = await test_function()
         assert result == "success"
+
+    async def test_payload_error_takes_precedence(self):
+        """Test that a payload error mentioning engineio is logged as a payload error."""
+
+        @handle_engineio_errors
+        async def test_function():
+            raise RuntimeError("engineio: Too many packets in payload")
+
+        with patch("tahecho.utils.error_handling.logger") as mock_logger:
+            result = await test_function()
+
+            assert result == {"error": "Connection issue detected, please try again"}
+            mock_logger.warning.assert_called_once_with(
+                "EngineIO payload error (transient): %s",
+                "engineio: Too many packets in payload",
+            )
+
+    async def test_engineio_error_matching_is_case_insensitive(self):
+        """Test that EngineIO errors are recognised regardless of case."""
+
+        @handle_engineio_errors
+        async def test_function():
+            raise RuntimeError("EngineIO transport closed")
+
+        with patch("tahecho.utils.error_handling.logger") as mock_logger:
+            result = await test_function()
+
+            assert result == {"error": "Connection issue detected, please try again"}
+            mock_logger.warning.assert_called_once_with(
+                "EngineIO/SocketIO error (transient): %s", "EngineIO transport closed"
+            )
+
+    async def test_unexpected_error_logged_with_traceback(self):
+        """Test that unexpected errors are logged once with exc_info."""
+
+        @handle_engineio_errors
+        async def test_function():
+            raise ValueError("Some other error")
+
+        with patch("tahecho.utils.error_handling.logger") as mock_logger:
+            with pytest.raises(ValueError):
+                await test_function()
+
+            mock_logger.error.assert_called_once_with(
+                "Unexpected error in %s: %s",
+                "test_function",
+                "Some other error",
+                exc_info=True,
+            )
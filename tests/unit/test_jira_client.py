@@ -0,0 +1,59 @@
+from unittest.mock import Mock
+
+from tahecho.jira_integration.jira_client import JiraClient, _create_session
+
+
+class TestJiraClientIssues:
+    """Test cases for JiraClient issue listing."""
+
+    def test_get_all_jira_issues_updated_since(self):
+        """Test that the recency filter is pushed into the JQL query."""
+        client = JiraClient()
+        client.instance = Mock()
+        client.instance.jql.return_value = {"issues": [], "total": 0}
+
+        client.get_all_jira_issues(updated_since="-7d")
+
+        jql = client.instance.jql.call_args.args[0]
+        assert jql == 'updated >= "-7d" ORDER BY created DESC'
+
+    def test_get_all_jira_issues_rejects_quoted_updated_since(self):
+        """Test that updated_since cannot break out of its JQL string."""
+        client = JiraClient()
+        client.instance = Mock()
+
+        result = client.get_all_jira_issues(updated_since='-7d" OR project = X')
+
+        assert "error" in result
+        client.instance.jql.assert_not_called()
+
+    def test_get_all_jira_issues_paginates(self):
+        """Test that every page is fetched, following the server's page size."""
+        client = JiraClient()
+        client.instance = Mock()
+        pages = [
+            {
+                "issues": [{"key": "DTS-1", "fields": {}}, {"key": "DTS-2", "fields": {}}],
+                "total": 3,
+            },
+            {"issues": [{"key": "DTS-3", "fields": {}}], "total": 3},
+        ]
+        client.instance.jql.side_effect = pages
+
+        issues = client.get_all_jira_issues(batch_size=500)
+
+        assert [issue["key"] for issue in issues] == ["DTS-1", "DTS-2", "DTS-3"]
+        starts = [call.kwargs["start"] for call in client.instance.jql.call_args_list]
+        assert starts == [0, 2]
+        assert "issuelinks" in client.instance.jql.call_args.kwargs["fields"]
+
+
+class TestJiraClientSession:
+    """Test cases for the JiraClient HTTP session."""
+
+    def test_session_pools_and_retries(self):
+        """Test that requests share a pooled session that retries throttling."""
+        adapter = _create_session().get_adapter("https://test.atlassian.net")
+
+        assert adapter._pool_maxsize == 32
+        assert 429 in adapter.max_retries.status_forcelist
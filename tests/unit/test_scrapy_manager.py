@@ -0,0 +1,689 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import numpy as np
+import pytest
+
+from tahecho.sitemap.scrapy_manager import (
+    Operation,
+    ScrapyManager,
+    _AutoscaledPool,
+    _PageBatchWriter,
+    _RateLimiter,
+    iter_sitemap_entries,
+    simhash,
+)
+
+ARTICLE = " ".join(
+    f"Section {i} explains how tickets move through sprint {i % 7} of project {i % 3}."
+    for i in range(60)
+)
+
+SITEMAP_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url>
+    <loc>https://example.com/docs/api</loc>
+    <lastmod>2024-01-01</lastmod>
+    <changefreq>weekly</changefreq>
+  </url>
+  <url><loc>https://example.com/blog/post</loc></url>
+  <url><loc>https://example.com/docs/tutorial</loc></url>
+</urlset>
+"""
+
+
+async def _chunked(data: bytes, size: int = 16):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def _page_html(title: str) -> str:
+    return f"<html><head><title>{title}</title></head><body><p>{title} body</p></body></html>"
+
+
+@pytest.fixture
+def config_manager():
+    """Mock configuration manager for ScrapyManager."""
+    manager = MagicMock()
+    manager.get_max_pages.return_value = 100
+    manager.get_requests_per_second.return_value = 1000
+    manager.get_per_domain_max_concurrency.return_value = 1
+    manager.get_max_tasks_per_minute.return_value = 1000
+    manager.get_desired_concurrency.return_value = 4
+    manager.get_max_memory_mb.return_value = 0
+    manager.get_write_batch_size.return_value = 100
+    manager.get_processing_config.return_value = {"verify_ssl": False, "batch_size": 10}
+    manager.get_embedding_config.return_value = {"dimension": 4}
+    manager.get_sitemap_domain.side_effect = lambda url: httpx.URL(url).host
+    return manager
+
+
+@pytest.fixture
+def scrapy_manager(config_manager):
+    """ScrapyManager with mocked Supabase and embedding backends."""
+    with patch("tahecho.sitemap.scrapy_manager.SupabaseIntegration"), patch(
+        "tahecho.sitemap.scrapy_manager.EmbeddingGenerator"
+    ):
+        manager = ScrapyManager(config_manager)
+
+    manager.supabase = MagicMock()
+    manager.supabase.create_sitemap_record = AsyncMock(return_value={"id": "sitemap_1"})
+    manager.supabase.create_web_page_records = AsyncMock(
+        side_effect=lambda pages: [{"id": "page", **page} for page in pages]
+    )
+    manager.embedding_generator = MagicMock()
+    manager.embedding_generator.generate_content_embedding = AsyncMock(
+        return_value=np.zeros(4, dtype=np.float32)
+    )
+    manager.embedding_generator.generate_content_embeddings_batch = AsyncMock(
+        side_effect=lambda contents: np.zeros((len(contents), 4), dtype=np.float32)
+    )
+    return manager
+
+
+def _operation(config, operation_id="op"):
+    return Operation(
+        id=operation_id,
+        url="https://example.com/sitemap.xml",
+        incremental=False,
+        differential=False,
+        config=config,
+    )
+
+
+def _mock_http_client(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def _site_handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/sitemap.xml":
+        return httpx.Response(200, content=SITEMAP_XML)
+    return httpx.Response(200, text=_page_html(request.url.path))
+
+
+class TestSimHash:
+    """Test near-duplicate fingerprints."""
+
+    def test_small_edit_keeps_fingerprint_close(self):
+        """Test that a trivial edit changes only a few fingerprint bits."""
+        edited = ARTICLE + " Last updated 2024-05-01."
+        other = ARTICLE.replace("tickets", "invoices").replace("sprint", "quarter")
+
+        assert (simhash(ARTICLE) ^ simhash(edited)).bit_count() <= 3
+        assert (simhash(ARTICLE) ^ simhash(other)).bit_count() > 3
+
+    def test_empty_text(self):
+        """Test that empty text has a zero fingerprint."""
+        assert simhash("") == 0
+
+
+class TestIterSitemapEntries:
+    """Test streaming sitemap parsing."""
+
+    async def test_parses_chunked_sitemap(self):
+        """Test that entries are parsed from a body split into small chunks."""
+        entries = [entry async for entry in iter_sitemap_entries(_chunked(SITEMAP_XML))]
+
+        assert [entry["loc"] for entry in entries] == [
+            "https://example.com/docs/api",
+            "https://example.com/blog/post",
+            "https://example.com/docs/tutorial",
+        ]
+        assert entries[0]["lastmod"] == "2024-01-01"
+        assert entries[0]["changefreq"] == "weekly"
+        assert entries[1]["lastmod"] is None
+
+    async def test_recovers_from_malformed_sitemap(self):
+        """Test that entries are still read from broken, truncated XML."""
+        broken = (
+            b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            b"<url><loc>https://example.com/search?a=1&b=2</loc></url>"
+            b"<url><loc>https://example.com/docs/api</loc></url>"
+            b"<url><loc>https://example.com/docs/tutorial</loc>"
+        )
+        parse_errors = []
+
+        entries = [
+            entry
+            async for entry in iter_sitemap_entries(_chunked(broken), parse_errors)
+        ]
+
+        assert [entry["loc"] for entry in entries][1:] == [
+            "https://example.com/docs/api",
+            "https://example.com/docs/tutorial",
+        ]
+        assert parse_errors
+
+
+class TestPageBatchWriter:
+    """Test bulk page writes."""
+
+    async def test_flushes_full_batches_and_remainder(self):
+        """Test that pages are written in batch_size groups."""
+        flush = AsyncMock()
+
+        async with _PageBatchWriter(flush, batch_size=2) as writer:
+            for i in range(5):
+                await writer.put({"url": f"page{i}"})
+
+        assert [len(call.args[0]) for call in flush.await_args_list] == [2, 2, 1]
+
+    async def test_flushes_after_interval(self):
+        """Test that a partial batch is written once the interval elapses."""
+        flush = AsyncMock()
+
+        async with _PageBatchWriter(flush, batch_size=10, flush_interval=0.01) as writer:
+            await writer.put({"url": "page0"})
+            await asyncio.sleep(0.05)
+            flush.assert_awaited_once_with([{"url": "page0"}])
+            await writer.put({"url": "page1"})
+
+        assert flush.await_count == 2
+
+    async def test_flush_errors_are_raised(self):
+        """Test that a failed bulk insert is reported to the producer."""
+        flush = AsyncMock(side_effect=RuntimeError("insert failed"))
+
+        with pytest.raises(RuntimeError, match="insert failed"):
+            async with _PageBatchWriter(flush, batch_size=1) as writer:
+                await writer.put({"url": "page0"})
+
+    async def test_producer_error_discards_queued_pages(self, caplog):
+        """Test that the writer is stopped and queued pages are reported on errors."""
+        flush = AsyncMock()
+
+        with pytest.raises(RuntimeError, match="fetch failed"):
+            async with _PageBatchWriter(flush, batch_size=10) as writer:
+                for i in range(3):
+                    await writer.put({"url": f"page{i}"})
+                raise RuntimeError("fetch failed")
+
+        assert writer._task.cancelled()
+        flush.assert_not_awaited()
+        assert "Discarded 3 queued pages" in caplog.text
+
+
+class TestScrapyManagerFullScrape:
+    """Test the full scrape pipeline."""
+
+    async def test_full_scrape_stores_filtered_pages(self, scrapy_manager):
+        """Test that sitemap pages are fetched, embedded and stored."""
+        scrapy_manager._add_operation(_operation({"filters": ["/docs"]}))
+
+        with patch.object(
+            scrapy_manager, "_http_client", return_value=_mock_http_client(_site_handler)
+        ):
+            await scrapy_manager._run_full_scrape("op")
+
+        scrapy_manager.supabase.create_web_page_records.assert_awaited_once()
+        stored = sorted(
+            scrapy_manager.supabase.create_web_page_records.await_args.args[0],
+            key=lambda page: page["url"],
+        )
+        assert [page["url"] for page in stored] == [
+            "https://example.com/docs/api",
+            "https://example.com/docs/tutorial",
+        ]
+        assert stored[0]["title"] == "/docs/api"
+        assert stored[0]["embedding"].shape == (4,)
+        scrapy_manager.embedding_generator.generate_content_embeddings_batch.assert_awaited_once()
+        scrapy_manager.embedding_generator.generate_content_embedding.assert_not_awaited()
+        assert stored[0]["sitemap_id"] == "sitemap_1"
+        assert stored[0]["metadata"]["lastmod"] == "2024-01-01"
+        assert scrapy_manager.operations["op"].pages_processed == 2
+        assert scrapy_manager.operations["op"].progress == 90
+
+    async def test_full_scrape_follows_sitemap_index(self, scrapy_manager):
+        """Test that nested sitemaps of a sitemap index are scraped."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/sitemap.xml":
+                return httpx.Response(
+                    200,
+                    content=b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                    b"<sitemap><loc>https://example.com/docs-sitemap.xml</loc></sitemap>"
+                    b"</sitemapindex>",
+                )
+            if request.url.path == "/docs-sitemap.xml":
+                return httpx.Response(200, content=SITEMAP_XML)
+            return httpx.Response(200, text=_page_html(request.url.path))
+
+        scrapy_manager._add_operation(_operation({}))
+
+        with patch.object(
+            scrapy_manager, "_http_client", return_value=_mock_http_client(handler)
+        ):
+            await scrapy_manager._run_full_scrape("op")
+
+        stored = scrapy_manager.supabase.create_web_page_records.await_args.args[0]
+        assert len(stored) == 3
+        assert scrapy_manager.operations["op"].parse_errors == 0
+
+    async def test_full_scrape_respects_max_pages(self, scrapy_manager):
+        """Test that scraping stops after max_pages pages."""
+        scrapy_manager._add_operation(_operation({"max_pages": 1}))
+
+        with patch.object(
+            scrapy_manager, "_http_client", return_value=_mock_http_client(_site_handler)
+        ):
+            await scrapy_manager._run_full_scrape("op")
+
+        stored = scrapy_manager.supabase.create_web_page_records.await_args.args[0]
+        assert len(stored) == 1
+        assert scrapy_manager.operations["op"].pages_processed == 1
+
+    async def test_progress_published_while_scraping(self, scrapy_manager):
+        """Test that page counters reach the operation before the scrape ends."""
+        published = []
+
+        async def slow_fetch(client, entry, sitemap_id, existing_page=None):
+            await asyncio.sleep(0.03)
+            published.append(scrapy_manager.operations["op"].pages_processed)
+            return None
+
+        scrapy_manager._add_operation(_operation({}))
+        scrapy_manager.config_manager.get_desired_concurrency.return_value = 1
+
+        with patch.object(
+            scrapy_manager, "_http_client", return_value=_mock_http_client(_site_handler)
+        ), patch.object(scrapy_manager, "_fetch_page", side_effect=slow_fetch), patch(
+            "tahecho.sitemap.scrapy_manager.PROGRESS_UPDATE_INTERVAL", 0.01
+        ):
+            await scrapy_manager._run_full_scrape("op")
+
+        assert published[-1] > 0
+        assert scrapy_manager.operations["op"].pages_processed == 3
+        assert scrapy_manager.operations["op"].pages_unchanged == 3
+
+
+class TestScrapyManagerIncrementalUpdate:
+    """Test incremental updates."""
+
+    async def test_unmodified_pages_are_skipped(self, scrapy_manager):
+        """Test that conditional requests skip re-embedding unchanged pages."""
+        requests_seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests_seen.append(request)
+            if request.url.path == "/sitemap.xml":
+                return httpx.Response(200, content=SITEMAP_XML)
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(
+                200, text=_page_html(request.url.path), headers={"ETag": '"v2"'}
+            )
+
+        scrapy_manager.supabase.get_documents_by_urls = AsyncMock(
+            return_value={
+                "https://example.com/docs/api": {
+                    "id": "doc_api",
+                    "url": "https://example.com/docs/api",
+                    "metadata": {"etag": '"v1"'},
+                },
+                "https://example.com/blog/post": {
+                    "id": "doc_blog",
+                    "url": "https://example.com/blog/post",
+                    "metadata": {"etag": '"v0"'},
+                },
+            }
+        )
+        scrapy_manager.supabase.update_document = AsyncMock(return_value={})
+        scrapy_manager._add_operation(_operation({}))
+
+        with patch.object(
+            scrapy_manager, "_http_client", return_value=_mock_http_client(handler)
+        ):
+            await scrapy_manager._run_incremental_update("op", {"id": "sitemap_1"})
+
+        scrapy_manager.supabase.get_documents_by_urls.assert_awaited_once_with(
+            [
+                "https://example.com/docs/api",
+                "https://example.com/blog/post",
+                "https://example.com/docs/tutorial",
+            ],
+            source_id="sitemap_1",
+        )
+        operation = scrapy_manager.operations["op"]
+        assert operation.pages_processed == 3
+        assert operation.pages_unchanged == 1
+        embedding_generator = scrapy_manager.embedding_generator
+        assert embedding_generator.generate_content_embedding.await_count == 1
+        assert embedding_generator.generate_content_embeddings_batch.await_count == 1
+
+        scrapy_manager.supabase.update_document.assert_awaited_once()
+        doc_id, update = scrapy_manager.supabase.update_document.await_args.args
+        assert doc_id == "doc_blog"
+        assert update["metadata"]["etag"] == '"v2"'
+
+        created = scrapy_manager.supabase.create_web_page_records.await_args.args[0]
+        assert [page["url"] for page in created] == ["https://example.com/docs/tutorial"]
+        tutorial_request = next(
+            request for request in requests_seen if request.url.path == "/docs/tutorial"
+        )
+        assert "If-None-Match" not in tutorial_request.headers
+
+    async def test_unchanged_content_is_not_re_embedded(self, scrapy_manager):
+        """Test that a refetched page with the same text skips embedding."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/sitemap.xml":
+                return httpx.Response(
+                    200,
+                    content=b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                    b"<url><loc>https://example.com/docs/api</loc></url></urlset>",
+                )
+            # Script contents change on every request but are not page text
+            return httpx.Response(
+                200,
+                text="<html><title>API</title><script>var t = Date.now();</script>"
+                "<body>API reference</body></html>",
+                headers={"ETag": '"v2"'},
+            )
+
+        async with _mock_http_client(handler) as client:
+            page = await scrapy_manager._fetch_page(
+                client, {"loc": "https://example.com/docs/api"}, "sitemap_1"
+            )
+
+        scrapy_manager.supabase.get_documents_by_urls = AsyncMock(
+            return_value={
+                "https://example.com/docs/api": {
+                    "id": "doc_api",
+                    "url": "https://example.com/docs/api",
+                    "content_hash": page["content_hash"],
+                    "metadata": {"etag": '"v1"'},
+                }
+            }
+        )
+        scrapy_manager.supabase.update_document = AsyncMock(return_value={})
+        scrapy_manager._add_operation(_operation({}))
+
+        with patch.object(
+            scrapy_manager, "_http_client", return_value=_mock_http_client(handler)
+        ):
+            await scrapy_manager._run_incremental_update("op", {"id": "sitemap_1"})
+
+        assert "Date.now" not in page["content"]
+        assert scrapy_manager.operations["op"].pages_unchanged == 1
+        scrapy_manager.embedding_generator.generate_content_embedding.assert_not_awaited()
+        scrapy_manager.embedding_generator.generate_content_embeddings_batch.assert_not_awaited()
+        scrapy_manager.supabase.update_document.assert_awaited_once_with(
+            "doc_api", {"metadata": {**page["metadata"]}}
+        )
+
+    async def test_incremental_update_fails_when_lookup_fails(self, scrapy_manager):
+        """Test that a failed stored-page lookup aborts instead of re-inserting pages."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/sitemap.xml":
+                return httpx.Response(200, content=SITEMAP_XML)
+            return httpx.Response(200, text=_page_html(request.url.path))
+
+        scrapy_manager.supabase.get_documents_by_urls = AsyncMock(
+            side_effect=Exception("connection reset")
+        )
+        scrapy_manager._add_operation(_operation({}))
+
+        with patch.object(
+            scrapy_manager, "_http_client", return_value=_mock_http_client(handler)
+        ), pytest.raises(Exception, match="connection reset"):
+            await scrapy_manager._run_incremental_update("op", {"id": "sitemap_1"})
+
+        scrapy_manager.supabase.create_web_page_records.assert_not_awaited()
+
+
+class TestScrapyManagerOperations:
+    """Test operation tracking."""
+
+    async def test_recent_operations_newest_first(self, scrapy_manager):
+        """Test that recent operations are listed newest first with ISO timestamps."""
+        for i in range(3):
+            operation = _operation({}, operation_id=f"op{i}")
+            operation.started_at = 1_700_000_000 + i
+            scrapy_manager._add_operation(operation)
+
+        recent = await scrapy_manager.get_recent_operations(limit=2)
+
+        assert [op["id"] for op in recent] == ["op2", "op1"]
+        assert recent[0]["started_at"] == "2023-11-14T22:13:22+00:00"
+        assert recent[0]["completed_at"] is None
+
+    def test_history_drops_oldest_finished_operations(self, scrapy_manager):
+        """Test that the operation history is bounded."""
+        with patch("tahecho.sitemap.scrapy_manager.MAX_OPERATION_HISTORY", 2):
+            running = _operation({}, operation_id="running")
+            scrapy_manager._add_operation(running)
+            for i in range(3):
+                operation = _operation({}, operation_id=f"op{i}")
+                operation.status = "completed"
+                scrapy_manager._add_operation(operation)
+
+            # The oldest operation is still running, so nothing can be dropped
+            assert len(scrapy_manager.operations) == 4
+
+            running.status = "completed"
+            scrapy_manager._add_operation(_operation({}, operation_id="op3"))
+
+        assert list(scrapy_manager.operations) == ["op2", "op3"]
+
+    async def test_operation_status_is_a_snapshot(self, scrapy_manager):
+        """Test that the returned status does not alias the live operation."""
+        scrapy_manager._add_operation(_operation({"max_pages": 1}))
+
+        status = await scrapy_manager.get_operation_status("op")
+        status["config"]["max_pages"] = 5
+
+        assert scrapy_manager.operations["op"].config == {"max_pages": 1}
+
+        with pytest.raises(ValueError):
+            await scrapy_manager.get_operation_status("missing")
+
+    async def test_operations_limited_per_domain(self, scrapy_manager):
+        """Test that operations on one domain run one at a time."""
+        running = {"example.com": 0, "other.com": 0}
+        peak = {"example.com": 0, "other.com": 0}
+
+        async def run(operation_id):
+            domain = httpx.URL(scrapy_manager.operations[operation_id].url).host
+            running[domain] += 1
+            peak[domain] = max(peak[domain], running[domain])
+            await asyncio.sleep(0.01)
+            running[domain] -= 1
+
+        for i, host in enumerate(["example.com", "example.com", "other.com"]):
+            operation = _operation({}, operation_id=f"op{i}")
+            operation.url = f"https://{host}/sitemap.xml"
+            scrapy_manager._add_operation(operation)
+
+        await asyncio.gather(
+            *(scrapy_manager._run_throttled(f"op{i}", run) for i in range(3))
+        )
+
+        assert peak == {"example.com": 1, "other.com": 1}
+
+
+class TestAutoscaledPool:
+    """Test the concurrent page worker pool."""
+
+    async def test_runs_items_concurrently_up_to_limit(self):
+        """Test that at most concurrency workers run at the same time."""
+        running = 0
+        peak = 0
+        seen = []
+
+        async def worker(item):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            seen.append(item)
+            running -= 1
+
+        async def items():
+            for i in range(10):
+                yield i
+
+        pool = _AutoscaledPool(worker, max_concurrency=3, desired_concurrency=3)
+        await pool.run(items())
+
+        assert sorted(seen) == list(range(10))
+        assert peak == 3
+
+    async def test_worker_errors_are_raised(self):
+        """Test that a failing worker stops the pool and surfaces the error."""
+
+        async def worker(item):
+            if item == 2:
+                raise RuntimeError("worker failed")
+            await asyncio.sleep(0.01)
+
+        async def items():
+            for i in range(5):
+                yield i
+
+        with pytest.raises(RuntimeError, match="worker failed"):
+            await _AutoscaledPool(worker, desired_concurrency=2).run(items())
+
+    async def test_scales_within_bounds(self):
+        """Test that concurrency grows while the event loop keeps up."""
+
+        async def worker(item):
+            await asyncio.sleep(0.01)
+
+        async def items():
+            for i in range(20):
+                yield i
+
+        pool = _AutoscaledPool(
+            worker,
+            max_concurrency=2,
+            desired_concurrency=1,
+            scale_interval=0.001,
+            max_loop_lag=1.0,
+        )
+        with patch.object(pool, "_memory_pressure", return_value=False):
+            await pool.run(items())
+
+        assert pool.concurrency == 2
+
+    def test_memory_pressure_uses_current_rss_against_budget(self):
+        """Test that the current RSS is compared with the configured budget."""
+        pool = _AutoscaledPool(MagicMock(), max_memory_bytes=1000, max_memory_ratio=0.5)
+
+        with patch("tahecho.sitemap.scrapy_manager._current_rss", return_value=400):
+            assert not pool._memory_pressure()
+        with patch("tahecho.sitemap.scrapy_manager._current_rss", return_value=600):
+            assert pool._memory_pressure()
+        with patch("tahecho.sitemap.scrapy_manager._current_rss", return_value=None):
+            assert not pool._memory_pressure()
+
+    def test_memory_pressure_disabled_without_budget(self):
+        """Test that no memory check is made without a budget."""
+        pool = _AutoscaledPool(MagicMock())
+
+        with patch("tahecho.sitemap.scrapy_manager._current_rss") as current_rss:
+            assert not pool._memory_pressure()
+        current_rss.assert_not_called()
+
+
+class TestRateLimiter:
+    """Test the token-bucket rate limiter."""
+
+    async def test_waits_once_bucket_is_empty(self):
+        """Test that acquisitions beyond the bucket size wait for a refill."""
+        limiter = _RateLimiter(max_tasks=2, period=0.2)
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        await limiter.acquire()
+        await limiter.acquire()
+        assert loop.time() - start < 0.05
+
+        await limiter.acquire()
+        assert loop.time() - start >= 0.08
+
+
+class TestScrapyManagerNearDuplicates:
+    """Test the near-duplicate skip in incremental updates."""
+
+    async def test_near_duplicate_page_is_not_re_embedded(self, scrapy_manager):
+        """Test that a page with a trivial edit keeps its stored embedding."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/sitemap.xml":
+                return httpx.Response(
+                    200,
+                    content=b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                    b"<url><loc>https://example.com/docs/api</loc></url></urlset>",
+                )
+            return httpx.Response(
+                200, text=f"<html><body>{ARTICLE} Rendered at 12:00:01.</body></html>"
+            )
+
+        stored_simhash = f"{simhash(ARTICLE):016x}"
+        scrapy_manager.supabase.get_documents_by_urls = AsyncMock(
+            return_value={
+                "https://example.com/docs/api": {
+                    "id": "doc_api",
+                    "url": "https://example.com/docs/api",
+                    "content_hash": "old",
+                    "metadata": {"simhash": stored_simhash},
+                }
+            }
+        )
+        scrapy_manager.supabase.update_document = AsyncMock(return_value={})
+        scrapy_manager._add_operation(_operation({}))
+
+        with patch.object(
+            scrapy_manager, "_http_client", return_value=_mock_http_client(handler)
+        ):
+            await scrapy_manager._run_incremental_update("op", {"id": "sitemap_1"})
+
+        assert scrapy_manager.operations["op"].pages_unchanged == 1
+        scrapy_manager.embedding_generator.generate_content_embedding.assert_not_awaited()
+        doc_id, update = scrapy_manager.supabase.update_document.await_args.args
+        assert doc_id == "doc_api"
+        assert update == {"metadata": {**update["metadata"], "simhash": stored_simhash}}
+
+
+class TestScrapyManagerDifferentialUpdate:
+    """Test section-limited updates."""
+
+    async def test_differential_update_scrapes_only_sections(self, scrapy_manager):
+        """Test that only pages below the requested sections are revalidated."""
+        scrapy_manager.supabase.get_documents_by_urls = AsyncMock(return_value={})
+        scrapy_manager._add_operation(
+            _operation({"differential_sections": ["/blog"], "filters": ["/docs"]})
+        )
+
+        with patch.object(
+            scrapy_manager, "_http_client", return_value=_mock_http_client(_site_handler)
+        ):
+            await scrapy_manager._run_differential_update("op", {"id": "sitemap_1"})
+
+        stored = scrapy_manager.supabase.create_web_page_records.await_args.args[0]
+        assert [page["url"] for page in stored] == ["https://example.com/blog/post"]
+
+    async def test_simulation_flag_dispatches_to_simulated_paths(
+        self, scrapy_manager, monkeypatch
+    ):
+        """Test that TAHECHO_SIMULATE=1 runs the simulated paths without fetching."""
+        monkeypatch.setenv("TAHECHO_SIMULATE", "1")
+        scrapy_manager._add_operation(_operation({"differential_sections": ["/blog"]}))
+
+        with patch.object(scrapy_manager, "_http_client") as mock_http_client, patch.object(
+            scrapy_manager, "_simulate_scraping", AsyncMock()
+        ) as simulate_scraping, patch.object(
+            scrapy_manager, "_simulate_incremental_update", AsyncMock()
+        ) as simulate_incremental, patch.object(
+            scrapy_manager, "_simulate_differential_update", AsyncMock()
+        ) as simulate_differential:
+            await scrapy_manager._run_full_scrape("op")
+            await scrapy_manager._run_incremental_update("op", {"id": "sitemap_1"})
+            await scrapy_manager._run_differential_update("op", {"id": "sitemap_1"})
+
+        simulate_scraping.assert_awaited_once_with("op", "sitemap_1")
+        simulate_incremental.assert_awaited_once_with("op", "sitemap_1")
+        simulate_differential.assert_awaited_once_with("op", "sitemap_1", ["/blog"])
+        mock_http_client.assert_not_called()
@@ -1,9 +1,30 @@
 import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import numpy as np
 import pytest
 
-from tahecho.sitemap.supabase_integration import SupabaseIntegration
+from tahecho.sitemap.supabase_integration import SupabaseIntegration, _make_client
+
+# Built once at import; a tuple so no test can mutate the shared vector
+VALID_EMBEDDING = (0.1,) * 1536
+
+
+@pytest.fixture(autouse=True)
+def clear_client_cache():
+    """Reset the shared Supabase clients between tests."""
+    _make_client.cache_clear()
+    yield
+    _make_client.cache_clear()
+
+
+@pytest.fixture
+def integration():
+    """SupabaseIntegration backed by a MagicMock client."""
+    with patch(
+        "tahecho.sitemap.supabase_integration.create_client", return_value=MagicMock()
+    ):
+        return SupabaseIntegration("https://test.supabase.co", "test_key")
 
 
 class TestSupabaseIntegration:
@@ -22,52 +43,171 @@ class TestSupabaseIntegration:
             assert integration.client == mock_client
             assert integration.embedding_dimension == 1536
 
-    @pytest.mark.asyncio
-    async def test_create_document(self):
+    async def test_create_document(self, integration):
         """Test creating a document record."""
-        with patch("tahecho.sitemap.supabase_integration.create_client") as mock_create_client:
-            mock_client = MagicMock()
-            mock_create_client.return_value = mock_client
-
-            # Mock the table and insert operations
-            mock_table = MagicMock()
-            mock_insert = MagicMock()
-            mock_execute = MagicMock()
-            mock_client.table.return_value = mock_table
-            mock_table.insert.return_value = mock_insert
-            mock_insert.execute.return_value = mock_execute
-            mock_execute.data = [{"id": "test_id", "content": "test content"}]
+        mock_client = integration.client
 
-            integration = SupabaseIntegration("https://test.supabase.co", "test_key")
+        # Mock the table and insert operations
+        mock_table = MagicMock()
+        mock_insert = MagicMock()
+        mock_execute = MagicMock()
+        mock_client.table.return_value = mock_table
+        mock_table.insert.return_value = mock_insert
+        mock_insert.execute.return_value = mock_execute
+        mock_execute.data = [{"id": "test_id", "content": "test content"}]
 
-            document_data = {"content": "test content", "url": "https://example.com"}
-            result = await integration.create_document(document_data)
+        document_data = {"content": "test content", "url": "https://example.com"}
+        result = await integration.create_document(document_data)
 
-            assert result["id"] == "test_id"
-            assert result["content"] == "test content"
-            mock_client.table.assert_called_with("documents")
+        assert result["id"] == "test_id"
+        assert result["content"] == "test content"
+        mock_client.table.assert_called_with("documents")
 
-    @pytest.mark.asyncio
-    async def test_get_sitemap_by_url(self):
+    async def test_get_sitemap_by_url(self, integration):
         """Test getting sitemap by URL."""
+        mock_client = integration.client
+
+        # Mock the table and select operations
+        mock_table = MagicMock()
+        mock_select = MagicMock()
+        mock_eq = MagicMock()
+        mock_execute = MagicMock()
+        mock_client.table.return_value = mock_table
+        mock_table.select.return_value = mock_select
+        mock_select.eq.return_value = mock_eq
+        mock_eq.execute.return_value = mock_execute
+        mock_execute.data = [{"id": "test_id", "url": "https://example.com/sitemap.xml"}]
+
+        result = await integration.get_sitemap_by_url("https://example.com/sitemap.xml")
+
+        assert result["id"] == "test_id"
+        assert result["url"] == "https://example.com/sitemap.xml"
+
+    async def test_create_web_page_records_bulk(self, integration):
+        """Test creating several web page documents with one insert."""
+        mock_client = integration.client
+        mock_execute = mock_client.table.return_value.insert.return_value.execute
+        mock_execute.return_value.data = [{"id": "id_1"}, {"id": "id_2"}]
+
+        pages = [
+            {"url": "https://example.com/a", "sitemap_id": "s1", "embedding": VALID_EMBEDDING},
+            {"url": "https://example.com/b", "sitemap_id": "s1", "embedding": [0.2] * 1536},
+        ]
+        result = await integration.create_web_page_records(pages)
+
+        assert result == [{"id": "id_1"}, {"id": "id_2"}]
+        mock_client.table.return_value.insert.assert_called_once()
+        rows = mock_client.table.return_value.insert.call_args.args[0]
+        assert [row["url"] for row in rows] == ["https://example.com/a", "https://example.com/b"]
+        assert all(row["source_id"] == "s1" for row in rows)
+
+    async def test_get_documents_by_urls_chunks_queries(self, integration):
+        """Test that URLs are looked up in chunks and merged by URL."""
+        mock_client = integration.client
+        mock_in = mock_client.table.return_value.select.return_value.in_
+        mock_in.return_value.execute.side_effect = [
+            MagicMock(data=[{"id": "id_a", "url": "https://example.com/a"}]),
+            MagicMock(data=[{"id": "id_c", "url": "https://example.com/c"}]),
+        ]
+
+        urls = ["https://example.com/a", "https://example.com/b", "https://example.com/c"]
+        result = await integration.get_documents_by_urls(urls, chunk=2)
+
+        assert result == {
+            "https://example.com/a": {"id": "id_a", "url": "https://example.com/a"},
+            "https://example.com/c": {"id": "id_c", "url": "https://example.com/c"},
+        }
+        assert [call.args for call in mock_in.call_args_list] == [
+            ("url", urls[:2]),
+            ("url", urls[2:]),
+        ]
+
+    async def test_get_documents_by_urls_raises_on_lookup_error(self, integration):
+        """Test that a failed lookup raises instead of returning a partial result."""
+        mock_client = integration.client
+        mock_in = mock_client.table.return_value.select.return_value.in_
+        mock_in.return_value.execute.side_effect = [
+            MagicMock(data=[{"id": "id_a", "url": "https://example.com/a"}]),
+            Exception("connection reset"),
+        ]
+
+        urls = ["https://example.com/a", "https://example.com/b", "https://example.com/c"]
+        with pytest.raises(Exception, match="connection reset"):
+            await integration.get_documents_by_urls(urls, chunk=2)
+
+    async def test_create_documents_bulk_rejects_wrong_dimension(self, integration):
+        """Test that a bulk insert fails when any embedding has the wrong size."""
+        mock_client = integration.client
+
+        documents = [
+            {"url": "https://example.com/a", "embedding": np.zeros(1536, dtype=np.float32)},
+            {"url": "https://example.com/b", "embedding": [0.1] * 768},
+        ]
+        with pytest.raises(ValueError):
+            await integration.create_documents_bulk(documents)
+
+        mock_client.table.return_value.insert.assert_not_called()
+
+    async def test_search_falls_back_to_full_precision(self, integration):
+        """Test that search uses match_documents when the halfvec RPC is missing."""
+        mock_client = integration.client
+        mock_rpc = mock_client.table.return_value.select.return_value.rpc
+        missing_function = Exception("function match_documents_half does not exist")
+        missing_function.code = "PGRST202"
+        mock_rpc.return_value.execute.side_effect = [
+            missing_function,
+            MagicMock(data=[{"id": "id_1", "similarity": 0.9}]),
+        ]
+
+        result = await integration.search_similar_documents(VALID_EMBEDDING)
+
+        assert result == [{"id": "id_1", "similarity": 0.9}]
+        assert [call.args[0] for call in mock_rpc.call_args_list] == [
+            "match_documents_half",
+            "match_documents",
+        ]
+        assert integration.use_half_precision_search is False
+
+    async def test_search_retries_full_precision_on_transient_error(self, integration):
+        """Test that other halfvec RPC errors fall back for that call only."""
+        mock_client = integration.client
+        mock_rpc = mock_client.table.return_value.select.return_value.rpc
+        mock_rpc.return_value.execute.side_effect = [
+            Exception("upstream request timeout"),
+            MagicMock(data=[{"id": "id_1", "similarity": 0.9}]),
+            MagicMock(data=[{"id": "id_2", "similarity": 0.8}]),
+        ]
+
+        first = await integration.search_similar_documents(VALID_EMBEDDING)
+        second = await integration.search_similar_documents(VALID_EMBEDDING)
+
+        assert first == [{"id": "id_1", "similarity": 0.9}]
+        assert second == [{"id": "id_2", "similarity": 0.8}]
+        assert [call.args[0] for call in mock_rpc.call_args_list] == [
+            "match_documents_half",
+            "match_documents",
+            "match_documents_half",
+        ]
+        assert integration.use_half_precision_search is True
+
+    def test_client_shared_between_instances(self):
+        """Test that integrations for the same project reuse one client."""
         with patch("tahecho.sitemap.supabase_integration.create_client") as mock_create_client:
-            mock_client = MagicMock()
-            mock_create_client.return_value = mock_client
+            first = SupabaseIntegration("https://test.supabase.co", "test_key")
+            second = SupabaseIntegration("https://test.supabase.co", "test_key")
+            other = SupabaseIntegration("https://other.supabase.co", "test_key")
 
-            # Mock the table and select operations
-            mock_table = MagicMock()
-            mock_select = MagicMock()
-            mock_eq = MagicMock()
-            mock_execute = MagicMock()
-            mock_client.table.return_value = mock_table
-            mock_table.select.return_value = mock_select
-            mock_select.eq.return_value = mock_eq
-            mock_eq.execute.return_value = mock_execute
-            mock_execute.data = [{"id": "test_id", "url": "https://example.com/sitemap.xml"}]
+            assert first.client is second.client
+            assert mock_create_client.call_count == 2
+            assert other.client is not None
 
-            integration = SupabaseIntegration("https://test.supabase.co", "test_key")
+    def test_failed_client_creation_is_retried(self):
+        """Test that a failed client creation is not cached."""
+        with patch("tahecho.sitemap.supabase_integration.create_client") as mock_create_client:
+            mock_create_client.side_effect = [Exception("network down"), MagicMock()]
 
-            result = await integration.get_sitemap_by_url("https://example.com/sitemap.xml")
+            first = SupabaseIntegration("https://test.supabase.co", "test_key")
+            second = SupabaseIntegration("https://test.supabase.co", "test_key")
 
-            assert result["id"] == "test_id"
-            assert result["url"] == "https://example.com/sitemap.xml"
+            assert first.client is None
+            assert second.client is not None
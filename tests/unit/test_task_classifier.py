@@ -6,7 +6,11 @@ import pytest
 from langchain_core.messages import AIMessage
 
 from tahecho.agents.state import create_initial_state
-from tahecho.agents.task_classifier import TaskClassifier
+from tahecho.agents.task_classifier import (
+    CLASSIFICATION_PROMPT,
+    TaskClassifier,
+    _extract_json_blob,
+)
 
 
 class TestTaskClassifier:
@@ -19,7 +23,16 @@ class TestTaskClassifier:
 
         # Assert
         assert classifier.llm is not None
-        assert "task classifier" in str(classifier.classification_prompt).lower()
+        assert "task classifier" in CLASSIFICATION_PROMPT.lower()
+
+    def test_classification_prompt_formatting(self):
+        """Test that the prompt keeps literal braces and inserts user input verbatim."""
+        # Act
+        prompt = CLASSIFICATION_PROMPT.format(user_input="Show {ticket} DTS-1")
+
+        # Assert
+        assert "User request: Show {ticket} DTS-1" in prompt
+        assert '{\n  "task_type": "jira|general",' in prompt
 
     def test_classify_task_mcp(self):
         """Test classifying a Jira-related task as MCP."""
@@ -148,3 +161,85 @@ class TestTaskClassifierEdgeCases:
         assert (
             len(result_state.messages) == 2
         )  # Original message + classification message
+
+
+class TestConversationContext:
+    """Test follow-up detection from conversation context."""
+
+    def _jira_followup_state(self, user_input):
+        state = create_initial_state("Which tickets are assigned to me?")
+        state.messages.append(
+            AIMessage(content="Could you please tell me your Jira username?")
+        )
+        state.user_input = user_input
+        return state
+
+    def test_username_followup_is_jira(self):
+        """Test that a short answer to a Jira question stays with Jira."""
+        # Arrange
+        classifier = TaskClassifier()
+        state = self._jira_followup_state("wolfgang.ihloff")
+
+        # Act & Assert
+        assert classifier._check_conversation_context(state) == "jira"
+
+    def test_blank_input_is_not_followup(self):
+        """Test that empty or whitespace input short-circuits."""
+        # Arrange
+        classifier = TaskClassifier()
+
+        # Act & Assert
+        assert classifier._check_conversation_context(self._jira_followup_state("")) is None
+        assert classifier._check_conversation_context(self._jira_followup_state("   ")) is None
+
+    def test_long_input_is_not_followup(self):
+        """Test that long free-form input is classified from scratch."""
+        # Arrange
+        classifier = TaskClassifier()
+        state = self._jira_followup_state("word " * 50)
+
+        # Act & Assert
+        assert classifier._check_conversation_context(state) is None
+
+
+class TestExtractJsonBlob:
+    """Test JSON extraction from LLM responses."""
+
+    def test_extract_json_from_markdown(self):
+        """Test extracting the JSON object from a fenced response."""
+        # Arrange
+        response = '```json\n{"task_type": "jira", "reasoning": "ticket"}\n```'
+
+        # Act
+        blob = _extract_json_blob(response)
+
+        # Assert
+        assert blob == '{"task_type": "jira", "reasoning": "ticket"}'
+
+    def test_extract_first_object_only(self):
+        """Test that trailing objects and text are ignored."""
+        # Arrange
+        response = '{"task_type": "general", "nested": {"a": 1}} and {"other": 2}'
+
+        # Act
+        blob = _extract_json_blob(response)
+
+        # Assert
+        assert blob == '{"task_type": "general", "nested": {"a": 1}}'
+
+    def test_braces_inside_strings_are_ignored(self):
+        """Test that braces and escaped quotes in strings do not end the object."""
+        # Arrange
+        response = '{"reasoning": "uses } and \\" quotes {", "task_type": "jira"}'
+
+        # Act
+        blob = _extract_json_blob(response)
+
+        # Assert
+        assert blob == response
+
+    def test_no_json_returns_none(self):
+        """Test responses without a complete JSON object."""
+        # Act & Assert
+        assert _extract_json_blob("general") is None
+        assert _extract_json_blob('{"task_type": "jira"') is None